@@ -52,6 +52,22 @@ AGENT_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", "30"))
 
 def mock_inventory_response(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Mock inventory agent response."""
+    if payload.get("action") == "hold_bulk":
+        return {
+            "holds": [
+                {
+                    "hold_id": f"hold-mock-{i}",
+                    "sku": hold.get("sku"),
+                    "quantity": hold.get("quantity", 1),
+                    "location": hold.get("location", "online"),
+                    "status": "active"
+                }
+                for i, hold in enumerate(payload.get("holds", []))
+            ]
+        }
+    if "skus" in payload:
+        return {"items": {sku: mock_inventory_response({"sku": sku}) for sku in payload["skus"]}}
+
     sku = payload.get("sku", "SKU000001")
     location = payload.get("location", "")
     
@@ -365,6 +381,10 @@ async def call_real_agent(agent_name: str, payload: Dict[str, Any]) -> Dict[str,
     if agent_name == "fulfillment":
         return await _call_fulfillment_agent(payload)
 
+    # Bulk inventory lookups/holds have concrete REST endpoints instead of /handle
+    if agent_name == "inventory" and ("skus" in payload or payload.get("action") == "hold_bulk"):
+        return await _call_inventory_bulk(payload)
+
     url = f"{AGENT_URLS[agent_name]}/handle"
 
     try:
@@ -384,6 +404,34 @@ async def call_real_agent(agent_name: str, payload: Dict[str, Any]) -> Dict[str,
         raise Exception(f"{agent_name} service error: {e.response.status_code}")
 
 
+async def _call_inventory_bulk(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Route batched inventory lookups and holds to the bulk endpoints."""
+    base = AGENT_URLS["inventory"]
+
+    if payload.get("action") == "hold_bulk":
+        url = f"{base}/hold/bulk"
+        body = {"holds": payload.get("holds", []), "session_id": payload.get("session_id")}
+    else:
+        url = f"{base}/inventory/bulk"
+        body = {"skus": payload.get("skus", [])}
+
+    try:
+        async with httpx.AsyncClient(timeout=AGENT_TIMEOUT) as client:
+            logger.info(f"🌐 REAL CALL: inventory bulk at {url}")
+            response = await client.post(url, json=body)
+            response.raise_for_status()
+            return response.json()
+    except httpx.TimeoutException:
+        logger.error(f"⏱️ Timeout calling inventory after {AGENT_TIMEOUT}s")
+        raise Exception("inventory service timeout")
+    except httpx.ConnectError:
+        logger.error(f"🔌 Cannot connect to inventory at {base}")
+        raise Exception("Cannot connect to inventory service")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ HTTP error from inventory: {e.response.status_code}")
+        raise Exception(f"inventory service error: {e.response.status_code}")
+
+
 async def _call_payment_agent(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Route payment actions to concrete endpoints."""
     action = payload.get("action", "process")
@@ -438,72 +486,58 @@ async def _call_payment_agent(payload: Dict[str, Any]) -> Dict[str, Any]:
         raise Exception(f"Payment service error: {e.response.status_code}")
 
 
+# Fulfillment action -> (HTTP method, path, request body builder), built once at import.
+# Every endpoint is keyed by order_id, so dispatch reads it once and hands it to the builder.
+_FULFILLMENT_ROUTES = {
+    "start": ("POST", "/fulfillment/start", lambda p, order_id: {
+        "order_id": order_id,
+        "inventory_status": p.get("inventory_status", "RESERVED"),
+        "payment_status": p.get("payment_status", "SUCCESS"),
+        "amount": float(p.get("amount", 0)),
+        "inventory_hold_id": p.get("inventory_hold_id"),
+        "payment_transaction_id": p.get("payment_transaction_id"),
+    }),
+    "update_status": ("POST", "/fulfillment/update-status", lambda p, order_id: {
+        "order_id": order_id,
+        "new_status": p.get("new_status"),
+    }),
+    "mark_delivered": ("POST", "/fulfillment/mark-delivered", lambda p, order_id: {
+        "order_id": order_id,
+        "delivery_notes": p.get("delivery_notes"),
+    }),
+    "cancel": ("POST", "/fulfillment/cancel-order", lambda p, order_id: {
+        "order_id": order_id,
+        "reason": p.get("reason", "Customer request"),
+        "refund_amount": float(p.get("refund_amount", 0)),
+    }),
+    "return": ("POST", "/fulfillment/process-return", lambda p, order_id: {
+        "order_id": order_id,
+        "reason": p.get("reason", "Return"),
+        "refund_amount": float(p.get("refund_amount", 0)),
+    }),
+    "status": ("GET", "/fulfillment/{order_id}", None),
+}
+
+
 async def _call_fulfillment_agent(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Route fulfillment actions to concrete endpoints."""
     action = payload.get("action", "start")
     base = AGENT_URLS["fulfillment"]
 
+    route = _FULFILLMENT_ROUTES.get(action)
+    if route is None:
+        raise ValueError(f"Unknown fulfillment action: {action}")
+    method, path, build_body = route
+    order_id = payload.get("order_id")
+    url = base + path.format(order_id=order_id)
+
     try:
         async with httpx.AsyncClient(timeout=AGENT_TIMEOUT) as client:
-            if action == "start":
-                body = {
-                    "order_id": payload.get("order_id"),
-                    "inventory_status": payload.get("inventory_status", "RESERVED"),
-                    "payment_status": payload.get("payment_status", "SUCCESS"),
-                    "amount": float(payload.get("amount", 0)),
-                    "inventory_hold_id": payload.get("inventory_hold_id"),
-                    "payment_transaction_id": payload.get("payment_transaction_id"),
-                }
-                url = f"{base}/fulfillment/start"
-                logger.info(f"🌐 REAL CALL: fulfillment start at {url}")
-                response = await client.post(url, json=body)
-
-            elif action == "update_status":
-                url = f"{base}/fulfillment/update-status"
-                body = {
-                    "order_id": payload.get("order_id"),
-                    "new_status": payload.get("new_status"),
-                }
-                logger.info(f"🌐 REAL CALL: fulfillment update at {url}")
-                response = await client.post(url, json=body)
-
-            elif action == "mark_delivered":
-                url = f"{base}/fulfillment/mark-delivered"
-                body = {
-                    "order_id": payload.get("order_id"),
-                    "delivery_notes": payload.get("delivery_notes"),
-                }
-                logger.info(f"🌐 REAL CALL: fulfillment delivered at {url}")
-                response = await client.post(url, json=body)
-
-            elif action == "cancel":
-                url = f"{base}/fulfillment/cancel-order"
-                body = {
-                    "order_id": payload.get("order_id"),
-                    "reason": payload.get("reason", "Customer request"),
-                    "refund_amount": float(payload.get("refund_amount", 0)),
-                }
-                logger.info(f"🌐 REAL CALL: fulfillment cancel at {url}")
-                response = await client.post(url, json=body)
-
-            elif action == "return":
-                url = f"{base}/fulfillment/process-return"
-                body = {
-                    "order_id": payload.get("order_id"),
-                    "reason": payload.get("reason", "Return"),
-                    "refund_amount": float(payload.get("refund_amount", 0)),
-                }
-                logger.info(f"🌐 REAL CALL: fulfillment return at {url}")
-                response = await client.post(url, json=body)
-
-            elif action == "status":
-                order_id = payload.get("order_id")
-                url = f"{base}/fulfillment/{order_id}"
-                logger.info(f"🌐 REAL CALL: fulfillment status at {url}")
+            logger.info(f"🌐 REAL CALL: fulfillment {action} at {url}")
+            if method == "GET":
                 response = await client.get(url)
-
             else:
-                raise ValueError(f"Unknown fulfillment action: {action}")
+                response = await client.post(url, json=build_body(payload, order_id))
 
             response.raise_for_status()
             return response.json()
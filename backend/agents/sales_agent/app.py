@@ -11,6 +11,7 @@ A production-ready sales agent that uses:
 import logging
 import os
 import uuid
+from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from pathlib import Path
@@ -29,7 +30,7 @@ from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent / '.env')
 
 # Import LangGraph Sales Agent (absolute import for direct uvicorn execution)
-from sales_graph import process_message as process_with_langgraph
+from sales_graph import process_message as process_with_langgraph, close_worker_client, get_sales_agent_graph
 
 # Configure logging
 logging.basicConfig(
@@ -40,11 +41,20 @@ logger = logging.getLogger(__name__)
 
 PAYMENT_SERVICE_URL = os.getenv("PAYMENT_URL", "http://localhost:8003")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan event handler - compiles the graph before the first request, closes the worker client on shutdown"""
+    get_sales_agent_graph()
+    yield
+    await close_worker_client()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Sales Agent API with LangGraph + Vertex AI",
     description="Intelligent sales agent powered by Vertex AI intent detection and LangGraph workflow",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
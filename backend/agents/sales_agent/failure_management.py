@@ -392,10 +392,11 @@ class CancellationHandler:
             ]
             refund_amount = order_amount
         
-        customer_message = (
-            f"Your order has been cancelled successfully. "
-            f"{"A full refund of ₹" + f"{refund_amount:.2f}" + " will be processed within 5-7 business days." if refund_amount > 0 else ""}"
+        refund_note = (
+            f"A full refund of ₹{refund_amount:.2f} will be processed within 5-7 business days."
+            if refund_amount > 0 else ""
         )
+        customer_message = f"Your order has been cancelled successfully. {refund_note}"
         
         return FailureResolution(
             resolution_id=f"RES_{order_id}_{datetime.utcnow().timestamp()}",
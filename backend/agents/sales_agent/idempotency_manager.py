@@ -7,12 +7,12 @@ import json
 import logging
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class IdempotencyRecord:
     """
     Record of an idempotent operation
@@ -25,9 +25,16 @@ class IdempotencyRecord:
     request_hash: str
     response: Optional[Dict] = None
     status: str = "PENDING"  # PENDING, COMPLETED, FAILED
+    # Parsed once from expires_at; expiry checks compare against this
+    expires_at_dt: datetime = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.expires_at_dt = datetime.fromisoformat(self.expires_at)
     
     def to_dict(self) -> Dict:
-        return asdict(self)
+        data = asdict(self)
+        del data["expires_at_dt"]
+        return data
 
 
 class IdempotencyManager:
@@ -98,8 +105,7 @@ class IdempotencyManager:
         record = self._store[key]
         
         # Check if record has expired
-        expires_at = datetime.fromisoformat(record.expires_at)
-        if datetime.utcnow() > expires_at:
+        if datetime.utcnow() > record.expires_at_dt:
             logger.info(f"Idempotency record expired for key: {key}")
             del self._store[key]
             return None
@@ -228,8 +234,7 @@ class IdempotencyManager:
         expired_keys = []
         
         for key, record in self._store.items():
-            expires_at = datetime.fromisoformat(record.expires_at)
-            if now > expires_at:
+            if now > record.expires_at_dt:
                 expired_keys.append(key)
         
         for key in expired_keys:
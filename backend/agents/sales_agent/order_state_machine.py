@@ -3,9 +3,10 @@ Order State Machine - Foundation for Transaction Trust
 Member 4 Responsibility: State management and transition validation
 """
 from enum import Enum
-from typing import Optional, List, Dict
-from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Optional, List, Dict, FrozenSet, Mapping, Tuple
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,19 @@ class OrderState(str, Enum):
     RETURNED = "RETURNED"  # Item returned to warehouse
     REFUNDED = "REFUNDED"  # Money refunded to customer
 
+    def __new__(cls, value: str):
+        # Values stay strings (they are serialized in API payloads); the
+        # ordinal gives internal tables an integer index per state
+        obj = str.__new__(cls, value)
+        obj._value_ = value
+        obj.ordinal = len(cls.__members__)
+        return obj
+
+
+# Ordinal of each state, used as the bit position in transition masks. Keyed by
+# the enum so plain-string inputs ("PAID") resolve through str hashing too.
+_STATE_INDEX: Dict[OrderState, int] = {state: state.ordinal for state in OrderState}
+
 
 class RefundState(str, Enum):
     """
@@ -52,6 +66,24 @@ class FailureType(str, Enum):
     SYSTEM_ERROR = "SYSTEM_ERROR"
 
 
+class Severity(str, Enum):
+    """
+    Failure severity levels, ordered by rank for escalation decisions
+    """
+    LOW = "LOW"
+    MEDIUM = "MEDIUM"
+    HIGH = "HIGH"
+    CRITICAL = "CRITICAL"
+
+    @property
+    def rank(self) -> int:
+        """Integer rank (LOW=0 .. CRITICAL=3) for cheap ordering comparisons"""
+        return _SEVERITY_RANK[self]
+
+
+_SEVERITY_RANK: Dict[Severity, int] = {severity: i for i, severity in enumerate(Severity)}
+
+
 class StateTransition:
     """
     Defines valid state transitions and their rules
@@ -83,33 +115,43 @@ class StateTransition:
         Returns:
             True if transition is valid, False otherwise
         """
-        if from_state not in cls.VALID_TRANSITIONS:
+        mask = _TRANSITION_MASK.get(from_state)
+        if mask is None:
             logger.error(f"Unknown from_state: {from_state}")
             return False
         
-        allowed_states = cls.VALID_TRANSITIONS[from_state]
-        is_valid = to_state in allowed_states
+        to_index = _STATE_INDEX.get(to_state)
+        is_valid = to_index is not None and bool((mask >> to_index) & 1)
         
         if not is_valid:
-            logger.warning(
-                f"Invalid state transition attempted: {from_state} -> {to_state}. "
-                f"Allowed transitions: {allowed_states}"
-            )
+            # Log the first attempt per (from, to) pair, then 1 in N repeats.
+            # Unknown targets share one bucket so bad input cannot grow the map.
+            key = (from_state, to_state if to_index is not None else None)
+            count = _invalid_transition_counts.get(key, 0) + 1
+            _invalid_transition_counts[key] = count
+            if count == 1 or count % INVALID_TRANSITION_LOG_EVERY == 0:
+                logger.warning(
+                    "Invalid state transition attempted: %s -> %s. Allowed transitions: %s (seen %d times)",
+                    from_state, to_state, cls.VALID_TRANSITIONS[from_state], count
+                )
         
         return is_valid
     
     @classmethod
-    def get_allowed_transitions(cls, current_state: OrderState) -> List[OrderState]:
+    def get_allowed_transitions(cls, current_state: OrderState) -> Tuple[OrderState, ...]:
         """
-        Get list of allowed next states from current state
+        Get allowed next states from current state
         
         Args:
             current_state: Current order state
             
         Returns:
-            List of allowed next states
+            Tuple of allowed next states (empty for unknown states)
         """
-        return cls.VALID_TRANSITIONS.get(current_state, [])
+        index = _STATE_INDEX.get(current_state)
+        if index is None:
+            return ()
+        return _ALLOWED_TRANSITIONS[index]
     
     @classmethod
     def is_terminal_state(cls, state: OrderState) -> bool:
@@ -122,7 +164,65 @@ class StateTransition:
         Returns:
             True if terminal state, False otherwise
         """
-        return len(cls.VALID_TRANSITIONS.get(state, [])) == 0
+        return _TRANSITION_MASK.get(state, 0) == 0
+
+
+# Invalid-transition warnings are sampled: repeated probes of the same pair
+# (e.g. a UI checking every button) would otherwise flood the log
+INVALID_TRANSITION_LOG_EVERY = 100
+_invalid_transition_counts: Dict[tuple, int] = {}
+
+# Allowed targets per state as a flat tuple indexed by OrderState.ordinal
+_ALLOWED_TRANSITIONS: Tuple[Tuple[OrderState, ...], ...] = tuple(
+    tuple(StateTransition.VALID_TRANSITIONS.get(state, ())) for state in OrderState
+)
+
+# Allowed targets per state as a bitmask over _STATE_INDEX
+_TRANSITION_MASK: Dict[OrderState, int] = {
+    state: sum(1 << _STATE_INDEX[target] for target in targets)
+    for state, targets in StateTransition.VALID_TRANSITIONS.items()
+}
+
+
+# States from which an order may still be cancelled
+_CANCELLABLE_STATES: FrozenSet[OrderState] = frozenset({
+    OrderState.CREATED,
+    OrderState.PAYMENT_PENDING,
+    OrderState.PAID
+})
+
+# Shipped and delivered orders share one entry rather than two equal copies
+_CANCEL_RETURN_FLOW: Mapping[str, str] = MappingProxyType({
+    "action": "RETURN_FLOW",
+    "description": "Cannot cancel, initiate return flow"
+})
+
+# Cancellation action per state, built once at import and shared read-only
+_CANCEL_ACTIONS: Mapping[OrderState, Mapping[str, str]] = MappingProxyType({
+    OrderState.CREATED: MappingProxyType({
+        "action": "CANCEL",
+        "description": "Cancel order immediately, no refund needed"
+    }),
+    OrderState.PAYMENT_PENDING: MappingProxyType({
+        "action": "CANCEL",
+        "description": "Cancel payment attempt, mark order cancelled"
+    }),
+    OrderState.PAID: MappingProxyType({
+        "action": "FULL_REFUND",
+        "description": "Cancel order and initiate full refund"
+    }),
+    OrderState.PACKED: MappingProxyType({
+        "action": "EXCHANGE_ONLY",
+        "description": "Cannot cancel, only exchange available"
+    }),
+    OrderState.SHIPPED: _CANCEL_RETURN_FLOW,
+    OrderState.DELIVERED: _CANCEL_RETURN_FLOW,
+})
+
+_CANCEL_NOT_ALLOWED: Mapping[str, str] = MappingProxyType({
+    "action": "NOT_ALLOWED",
+    "description": "Cancellation not allowed in this state"
+})
 
 
 class CancellationRules:
@@ -141,15 +241,10 @@ class CancellationRules:
         Returns:
             True if cancellation is allowed
         """
-        cancellable_states = [
-            OrderState.CREATED,
-            OrderState.PAYMENT_PENDING,
-            OrderState.PAID
-        ]
-        return order_state in cancellable_states
+        return order_state in _CANCELLABLE_STATES
     
     @staticmethod
-    def get_cancel_action(order_state: OrderState) -> Dict[str, str]:
+    def get_cancel_action(order_state: OrderState) -> Mapping[str, str]:
         """
         Get appropriate action when cancellation is requested
         
@@ -157,38 +252,106 @@ class CancellationRules:
             order_state: Current order state
             
         Returns:
-            Dictionary with action type and description
+            Read-only mapping with action type and description
         """
-        actions = {
-            OrderState.CREATED: {
-                "action": "CANCEL",
-                "description": "Cancel order immediately, no refund needed"
-            },
-            OrderState.PAYMENT_PENDING: {
-                "action": "CANCEL",
-                "description": "Cancel payment attempt, mark order cancelled"
-            },
-            OrderState.PAID: {
-                "action": "FULL_REFUND",
-                "description": "Cancel order and initiate full refund"
-            },
-            OrderState.PACKED: {
-                "action": "EXCHANGE_ONLY",
-                "description": "Cannot cancel, only exchange available"
-            },
-            OrderState.SHIPPED: {
-                "action": "RETURN_FLOW",
-                "description": "Cannot cancel, initiate return flow"
-            },
-            OrderState.DELIVERED: {
-                "action": "RETURN_FLOW",
-                "description": "Cannot cancel, initiate return flow"
-            }
-        }
-        return actions.get(order_state, {
-            "action": "NOT_ALLOWED",
-            "description": "Cancellation not allowed in this state"
-        })
+        return _CANCEL_ACTIONS.get(order_state, _CANCEL_NOT_ALLOWED)
+
+
+# Recommended handling per failure type, built once at import and shared read-only
+_FAILURE_ACTIONS: Mapping[FailureType, Mapping[str, Any]] = MappingProxyType({
+    FailureType.OUT_OF_STOCK: MappingProxyType({
+        "severity": Severity.HIGH,
+        "actions": (
+            "Check nearby store availability",
+            "Suggest similar products",
+            "Offer waitlist registration",
+            "Block checkout for this SKU"
+        ),
+        "user_options": ("alternate_store", "similar_product", "waitlist", "cancel"),
+        "system_action": "BLOCK_CHECKOUT"
+    }),
+    FailureType.INVENTORY_MISMATCH: MappingProxyType({
+        "severity": Severity.CRITICAL,
+        "actions": (
+            "Lock affected inventory",
+            "Initiate apology flow",
+            "Offer partial refund",
+            "Provide replacement options",
+            "Auto-apply loyalty compensation"
+        ),
+        "user_options": ("partial_refund", "replacement", "wait_restock", "full_refund"),
+        "system_action": "LOCK_INVENTORY"
+    }),
+    FailureType.PAYMENT_FAILED: MappingProxyType({
+        "severity": Severity.MEDIUM,
+        "actions": (
+            "Open retry window (5 minutes)",
+            "Suggest alternative payment method",
+            "Check payment gateway status",
+            "Preserve cart state"
+        ),
+        "user_options": ("retry", "change_payment_method", "cancel"),
+        "system_action": "HOLD_CART"
+    }),
+    FailureType.DUPLICATE_PAYMENT: MappingProxyType({
+        "severity": Severity.CRITICAL,
+        "actions": (
+            "Validate idempotency key",
+            "Block duplicate order creation",
+            "Auto-trigger refund for duplicate",
+            "Alert fraud detection system"
+        ),
+        "user_options": (),
+        "system_action": "AUTO_REFUND"
+    }),
+    FailureType.CANCEL_AFTER_PAYMENT: MappingProxyType({
+        "severity": Severity.HIGH,
+        "actions": (
+            "Check fulfillment state",
+            "If not shipped: instant cancel + refund",
+            "If shipped: convert to return flow",
+            "Update inventory immediately"
+        ),
+        "user_options": ("confirm_cancel",),
+        "system_action": "CHECK_FULFILLMENT_STATE"
+    }),
+    FailureType.ADDRESS_ERROR: MappingProxyType({
+        "severity": Severity.MEDIUM,
+        "actions": (
+            "Validate pincode",
+            "Offer address correction",
+            "Hold fulfillment until fixed",
+            "Suggest alternate delivery location"
+        ),
+        "user_options": ("correct_address", "change_location"),
+        "system_action": "HOLD_FULFILLMENT"
+    }),
+    FailureType.DELIVERY_FAILED: MappingProxyType({
+        "severity": Severity.HIGH,
+        "actions": (
+            "Reattempt delivery (3 attempts max)",
+            "Contact customer for availability",
+            "Offer alternate delivery slot",
+            "Return to warehouse if all attempts fail"
+        ),
+        "user_options": ("reschedule", "change_address", "pickup"),
+        "system_action": "REATTEMPT_DELIVERY"
+    }),
+    FailureType.SYSTEM_ERROR: MappingProxyType({
+        "severity": Severity.CRITICAL,
+        "actions": (
+            "Log error details",
+            "Rollback partial transaction",
+            "Alert engineering team",
+            "Provide user with incident ID"
+        ),
+        "user_options": ("retry_later", "contact_support"),
+        "system_action": "ROLLBACK"
+    }),
+})
+
+# Shared payload for unknown failure types
+_SYSTEM_ERROR_ACTIONS: Mapping[str, Any] = _FAILURE_ACTIONS[FailureType.SYSTEM_ERROR]
 
 
 class FailureDecisionTree:
@@ -197,7 +360,7 @@ class FailureDecisionTree:
     """
     
     @staticmethod
-    def get_failure_actions(failure_type: FailureType, context: Dict) -> Dict:
+    def get_failure_actions(failure_type: FailureType, context: Dict) -> Mapping[str, Any]:
         """
         Get recommended actions for a specific failure type
         
@@ -206,112 +369,19 @@ class FailureDecisionTree:
             context: Additional context (order details, inventory, etc.)
             
         Returns:
-            Dictionary with recommended actions and options
+            Read-only mapping with recommended actions and options. The same
+            shared instance (with tuple-valued lists) is returned on every call,
+            so callers that need to modify it must copy first.
         """
-        if failure_type == FailureType.OUT_OF_STOCK:
-            return {
-                "severity": "HIGH",
-                "actions": [
-                    "Check nearby store availability",
-                    "Suggest similar products",
-                    "Offer waitlist registration",
-                    "Block checkout for this SKU"
-                ],
-                "user_options": ["alternate_store", "similar_product", "waitlist", "cancel"],
-                "system_action": "BLOCK_CHECKOUT"
-            }
-        
-        elif failure_type == FailureType.INVENTORY_MISMATCH:
-            return {
-                "severity": "CRITICAL",
-                "actions": [
-                    "Lock affected inventory",
-                    "Initiate apology flow",
-                    "Offer partial refund",
-                    "Provide replacement options",
-                    "Auto-apply loyalty compensation"
-                ],
-                "user_options": ["partial_refund", "replacement", "wait_restock", "full_refund"],
-                "system_action": "LOCK_INVENTORY"
-            }
-        
-        elif failure_type == FailureType.PAYMENT_FAILED:
-            return {
-                "severity": "MEDIUM",
-                "actions": [
-                    "Open retry window (5 minutes)",
-                    "Suggest alternative payment method",
-                    "Check payment gateway status",
-                    "Preserve cart state"
-                ],
-                "user_options": ["retry", "change_payment_method", "cancel"],
-                "system_action": "HOLD_CART"
-            }
-        
-        elif failure_type == FailureType.DUPLICATE_PAYMENT:
-            return {
-                "severity": "CRITICAL",
-                "actions": [
-                    "Validate idempotency key",
-                    "Block duplicate order creation",
-                    "Auto-trigger refund for duplicate",
-                    "Alert fraud detection system"
-                ],
-                "user_options": [],
-                "system_action": "AUTO_REFUND"
-            }
-        
-        elif failure_type == FailureType.CANCEL_AFTER_PAYMENT:
-            return {
-                "severity": "HIGH",
-                "actions": [
-                    "Check fulfillment state",
-                    "If not shipped: instant cancel + refund",
-                    "If shipped: convert to return flow",
-                    "Update inventory immediately"
-                ],
-                "user_options": ["confirm_cancel"],
-                "system_action": "CHECK_FULFILLMENT_STATE"
-            }
-        
-        elif failure_type == FailureType.ADDRESS_ERROR:
-            return {
-                "severity": "MEDIUM",
-                "actions": [
-                    "Validate pincode",
-                    "Offer address correction",
-                    "Hold fulfillment until fixed",
-                    "Suggest alternate delivery location"
-                ],
-                "user_options": ["correct_address", "change_location"],
-                "system_action": "HOLD_FULFILLMENT"
-            }
-        
-        elif failure_type == FailureType.DELIVERY_FAILED:
-            return {
-                "severity": "HIGH",
-                "actions": [
-                    "Reattempt delivery (3 attempts max)",
-                    "Contact customer for availability",
-                    "Offer alternate delivery slot",
-                    "Return to warehouse if all attempts fail"
-                ],
-                "user_options": ["reschedule", "change_address", "pickup"],
-                "system_action": "REATTEMPT_DELIVERY"
-            }
-        
-        else:  # SYSTEM_ERROR
-            return {
-                "severity": "CRITICAL",
-                "actions": [
-                    "Log error details",
-                    "Rollback partial transaction",
-                    "Alert engineering team",
-                    "Provide user with incident ID"
-                ],
-                "user_options": ["retry_later", "contact_support"],
-                "system_action": "ROLLBACK"
-            }
+        return _FAILURE_ACTIONS.get(failure_type, _SYSTEM_ERROR_ACTIONS)
+
+
+# "FROM -> TO" label for every state pair, formatted once at import
+_TRANSITION_LABELS: Dict[tuple, str] = {
+    (from_state, to_state): f"{from_state} -> {to_state}"
+    for from_state in OrderState
+    for to_state in OrderState
+}
 
 
 class StateTransitionLogger:
@@ -339,17 +409,28 @@ class StateTransitionLogger:
             triggered_by: User/system that triggered transition
             reason: Reason for transition
             metadata: Additional context
+        
+        Returns:
+            Audit entry; "timestamp" is UTC epoch nanoseconds, formatting is
+            left to the sink that persists it
         """
+        transition = _TRANSITION_LABELS.get((from_state, to_state))
+        if transition is None:
+            transition = f"{from_state} -> {to_state}"
+        
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": time.time_ns(),
             "order_id": order_id,
-            "transition": f"{from_state} -> {to_state}",
+            "transition": transition,
             "triggered_by": triggered_by,
             "reason": reason,
             "metadata": metadata or {}
         }
         
-        logger.info(f"STATE_TRANSITION: {log_entry}")
+        # Skip the dict repr entirely when INFO is filtered out; structured
+        # handlers can read the entry from the record's "audit" attribute
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("STATE_TRANSITION: %s", log_entry, extra={"audit": log_entry})
         
         # In production, this would write to:
         # - Database audit table
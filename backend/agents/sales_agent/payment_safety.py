@@ -2,15 +2,65 @@
 Payment Safety Layer - Transaction Trust and Validation
 Member 4 Responsibility: Ensure payment integrity and prevent fraud
 """
+import hashlib
+import hmac
+import json
 import logging
-from typing import Dict, Any, Optional, List
+import operator
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet, Mapping
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, IntFlag
+from types import MappingProxyType
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes, with orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+# Settled transactions stay in memory at least this long; paid ones also stay
+# until validate_before_shipment has approved them
+SETTLED_TRANSACTION_TTL_SECONDS = float(os.getenv("SETTLED_TRANSACTION_TTL_SECONDS", "86400"))
+# Optional JSON-lines file that evicted transactions are appended to (cold storage)
+EVICTED_TRANSACTIONS_PATH = os.getenv("PAYMENT_EVICTED_TRANSACTIONS_PATH", "")
+
+# Shared secret for gateway callback signatures (HMAC-SHA256 over the canonical payload)
+PAYMENT_CALLBACK_SECRET = os.getenv("PAYMENT_CALLBACK_SECRET", "")
+
+# Keyed once; each verification copies this instead of re-hashing the key pads
+_CALLBACK_HMAC = (
+    hmac.new(PAYMENT_CALLBACK_SECRET.encode(), digestmod=hashlib.sha256)
+    if PAYMENT_CALLBACK_SECRET else None
+)
+
+# Fields every gateway callback must carry, fetched in one C-level call
+_CALLBACK_FIELDS = operator.itemgetter("order_id", "amount", "idempotency_key")
+
+# Shared read-only results for the (overwhelmingly common) passing checks
+_AMOUNT_OK = MappingProxyType({"valid": True, "message": "Amount validation passed"})
+_METHOD_OK = MappingProxyType({"valid": True, "message": "Payment method validated"})
+_USER_LIMIT_OK = MappingProxyType({"valid": True, "message": "User limit check passed"})
+_CALLBACK_OK = MappingProxyType({
+    "valid": True,
+    "message": "Payment callback validated successfully",
+    "action": "PROCESS_PAYMENT"
+})
+
+
 class PaymentStatus(str, Enum):
     """Payment transaction statuses"""
     INITIATED = "INITIATED"
@@ -21,7 +71,42 @@ class PaymentStatus(str, Enum):
     REFUNDED = "REFUNDED"
 
 
-@dataclass
+# Statuses after which no further callback is expected
+_SETTLED_STATUSES = frozenset({
+    PaymentStatus.SUCCESS,
+    PaymentStatus.FAILED,
+    PaymentStatus.CANCELLED,
+    PaymentStatus.REFUNDED
+})
+
+
+class CallbackCheck(IntFlag):
+    """Callback validation checks, combined into a failure bitmask"""
+    MISSING_FIELD = 1
+    ORDER_ID = 2
+    AMOUNT = 4
+    IDEMPOTENCY_KEY = 8
+    SIGNATURE = 16
+
+
+class PaymentMethod(str, Enum):
+    """Supported payment methods"""
+    CREDIT_CARD = "CREDIT_CARD"
+    DEBIT_CARD = "DEBIT_CARD"
+    UPI = "UPI"
+    NET_BANKING = "NET_BANKING"
+    WALLET = "WALLET"
+
+
+class RefundStatus(str, Enum):
+    """Refund lifecycle statuses"""
+    INITIATED = "INITIATED"
+    PROCESSING = "PROCESSING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+@dataclass(slots=True)
 class PaymentTransaction:
     """
     Payment transaction record
@@ -30,13 +115,14 @@ class PaymentTransaction:
     order_id: str
     user_id: str
     amount: float
-    payment_method: str
+    payment_method: PaymentMethod
     status: PaymentStatus
     gateway_reference: str
     idempotency_key: str
     created_at: str
     updated_at: str
     metadata: Dict[str, Any]
+    callback_processed_at: Optional[str] = None
     
     def to_dict(self) -> Dict:
         return {
@@ -44,14 +130,68 @@ class PaymentTransaction:
             "order_id": self.order_id,
             "user_id": self.user_id,
             "amount": self.amount,
-            "payment_method": self.payment_method,
+            "payment_method": self.payment_method.value,
             "status": self.status.value,
             "gateway_reference": self.gateway_reference,
             "idempotency_key": self.idempotency_key,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
+            "callback_processed_at": self.callback_processed_at,
             "metadata": self.metadata
         }
+    
+    def to_json_bytes(self) -> bytes:
+        return _dumps(self.to_dict())
+
+
+@dataclass(slots=True)
+class RefundTimelineEvent:
+    """
+    Single status change in a refund's lifecycle
+    """
+    status: RefundStatus
+    timestamp: str
+    notes: str
+    
+    def to_dict(self) -> Dict:
+        return {
+            "status": self.status.value,
+            "timestamp": self.timestamp,
+            "notes": self.notes
+        }
+
+
+@dataclass(slots=True)
+class RefundRecord:
+    """
+    Refund record with full status timeline
+    """
+    refund_id: str
+    order_id: str
+    transaction_id: str
+    amount: float
+    reason: str
+    refund_type: str
+    status: RefundStatus
+    initiated_at: str
+    completed_at: Optional[str]
+    gateway_reference: Optional[str]
+    timeline: List[RefundTimelineEvent]
+    
+    def to_dict(self) -> Dict:
+        return {
+            "refund_id": self.refund_id,
+            "order_id": self.order_id,
+            "transaction_id": self.transaction_id,
+            "amount": self.amount,
+            "reason": self.reason,
+            "refund_type": self.refund_type,
+            "status": self.status.value,
+            "initiated_at": self.initiated_at,
+            "completed_at": self.completed_at,
+            "gateway_reference": self.gateway_reference,
+            "timeline": [event.to_dict() for event in self.timeline]
+        }
 
 
 class PaymentValidator:
@@ -65,7 +205,7 @@ class PaymentValidator:
         order_amount: float,
         payment_amount: float,
         tolerance: float = 0.01
-    ) -> Dict[str, Any]:
+    ) -> Mapping[str, Any]:
         """
         Ensure payment amount matches order amount
         
@@ -75,12 +215,12 @@ class PaymentValidator:
             tolerance: Acceptable difference (for rounding)
             
         Returns:
-            Validation result
+            Validation result (a shared read-only mapping when the check passes)
         """
         if abs(order_amount - payment_amount) > tolerance:
             logger.error(
-                f"Payment amount mismatch: Order={order_amount}, "
-                f"Payment={payment_amount}"
+                "Payment amount mismatch: Order=%s, Payment=%s",
+                order_amount, payment_amount
             )
             return {
                 "valid": False,
@@ -89,40 +229,34 @@ class PaymentValidator:
                 "action": "REJECT_PAYMENT"
             }
         
-        return {
-            "valid": True,
-            "message": "Amount validation passed"
-        }
+        return _AMOUNT_OK
     
     @staticmethod
     def validate_payment_method(
         payment_method: str,
-        allowed_methods: List[str]
-    ) -> Dict[str, Any]:
+        allowed_methods: FrozenSet[str]
+    ) -> Mapping[str, Any]:
         """
         Validate payment method is supported
         
         Args:
             payment_method: Payment method to validate
-            allowed_methods: List of allowed payment methods
+            allowed_methods: Set of allowed payment methods
             
         Returns:
-            Validation result
+            Validation result (a shared read-only mapping when the check passes)
         """
         if payment_method not in allowed_methods:
-            logger.error(f"Invalid payment method: {payment_method}")
+            logger.error("Invalid payment method: %s", payment_method)
             return {
                 "valid": False,
                 "error": "INVALID_PAYMENT_METHOD",
                 "message": f"Payment method '{payment_method}' is not supported",
-                "allowed_methods": allowed_methods,
+                "allowed_methods": sorted(allowed_methods),
                 "action": "REJECT_PAYMENT"
             }
         
-        return {
-            "valid": True,
-            "message": "Payment method validated"
-        }
+        return _METHOD_OK
     
     @staticmethod
     def validate_user_limits(
@@ -130,7 +264,7 @@ class PaymentValidator:
         amount: float,
         user_daily_limit: float = 50000.0,
         user_daily_spent: float = 0.0
-    ) -> Dict[str, Any]:
+    ) -> Mapping[str, Any]:
         """
         Check if payment exceeds user limits
         
@@ -141,12 +275,12 @@ class PaymentValidator:
             user_daily_spent: Amount already spent today
             
         Returns:
-            Validation result
+            Validation result (a shared read-only mapping when the check passes)
         """
         if user_daily_spent + amount > user_daily_limit:
             logger.warning(
-                f"User {user_id} exceeds daily limit: "
-                f"Spent={user_daily_spent}, Attempt={amount}, Limit={user_daily_limit}"
+                "User %s exceeds daily limit: Spent=%s, Attempt=%s, Limit=%s",
+                user_id, user_daily_spent, amount, user_daily_limit
             )
             return {
                 "valid": False,
@@ -158,10 +292,7 @@ class PaymentValidator:
                 "action": "REQUIRE_VERIFICATION"
             }
         
-        return {
-            "valid": True,
-            "message": "User limit check passed"
-        }
+        return _USER_LIMIT_OK
 
 
 class PaymentCallbackValidator:
@@ -177,7 +308,7 @@ class PaymentCallbackValidator:
         expected_amount: float,
         expected_idempotency_key: str,
         signature: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> Mapping[str, Any]:
         """
         Validate payment callback from gateway
         
@@ -189,58 +320,79 @@ class PaymentCallbackValidator:
             signature: Callback signature for verification
             
         Returns:
-            Validation result with action
+            Validation result with action (a shared read-only mapping when valid)
         """
-        errors = []
-        
-        # Validate order ID match
-        callback_order_id = callback_data.get("order_id")
-        if callback_order_id != expected_order_id:
-            errors.append(
-                f"Order ID mismatch: Expected={expected_order_id}, "
-                f"Received={callback_order_id}"
-            )
-        
-        # Validate amount match
-        callback_amount = float(callback_data.get("amount", 0))
-        if abs(callback_amount - expected_amount) > 0.01:
-            errors.append(
-                f"Amount mismatch: Expected={expected_amount}, "
-                f"Received={callback_amount}"
-            )
+        failed = CallbackCheck(0)
         
-        # Validate idempotency key
-        callback_key = callback_data.get("idempotency_key")
-        if callback_key != expected_idempotency_key:
-            errors.append(
-                f"Idempotency key mismatch: Expected={expected_idempotency_key}, "
-                f"Received={callback_key}"
-            )
+        try:
+            callback_order_id, callback_amount, callback_key = _CALLBACK_FIELDS(callback_data)
+        except KeyError as missing:
+            failed |= CallbackCheck.MISSING_FIELD
+            missing_field = missing.args[0]
+        else:
+            callback_amount = float(callback_amount)
+            if callback_order_id != expected_order_id:
+                failed |= CallbackCheck.ORDER_ID
+            if abs(callback_amount - expected_amount) > 0.01:
+                failed |= CallbackCheck.AMOUNT
+            if callback_key != expected_idempotency_key:
+                failed |= CallbackCheck.IDEMPOTENCY_KEY
         
         # Validate signature if provided
-        if signature:
-            # In production, verify HMAC signature
-            # For now, just check it exists
-            if not callback_data.get("signature_verified", False):
-                errors.append("Signature verification failed")
+        if signature and not PaymentCallbackValidator.verify_signature(callback_data, signature):
+            failed |= CallbackCheck.SIGNATURE
         
-        if errors:
-            logger.critical(
-                f"PAYMENT CALLBACK VALIDATION FAILED: {errors}"
-            )
+        if failed:
+            # Messages are only formatted once a check has actually failed
+            errors = []
+            if failed & CallbackCheck.MISSING_FIELD:
+                errors.append(f"Missing callback field: {missing_field}")
+            if failed & CallbackCheck.ORDER_ID:
+                errors.append(
+                    f"Order ID mismatch: Expected={expected_order_id}, "
+                    f"Received={callback_order_id}"
+                )
+            if failed & CallbackCheck.AMOUNT:
+                errors.append(
+                    f"Amount mismatch: Expected={expected_amount}, "
+                    f"Received={callback_amount}"
+                )
+            if failed & CallbackCheck.IDEMPOTENCY_KEY:
+                errors.append(
+                    f"Idempotency key mismatch: Expected={expected_idempotency_key}, "
+                    f"Received={callback_key}"
+                )
+            if failed & CallbackCheck.SIGNATURE:
+                errors.append("Signature verification failed")
+            
+            logger.critical("PAYMENT CALLBACK VALIDATION FAILED: %s", errors)
             return {
                 "valid": False,
                 "errors": errors,
+                "failed_checks": int(failed),
                 "action": "REJECT_CALLBACK",
                 "alert": "POTENTIAL_FRAUD",
                 "message": "Payment callback failed validation checks"
             }
         
-        return {
-            "valid": True,
-            "message": "Payment callback validated successfully",
-            "action": "PROCESS_PAYMENT"
-        }
+        return _CALLBACK_OK
+    
+    @staticmethod
+    def verify_signature(callback_data: Dict[str, Any], signature: str) -> bool:
+        """
+        Verify the gateway's HMAC-SHA256 signature (hex) over the callback payload
+        Fails closed when PAYMENT_CALLBACK_SECRET is not configured
+        """
+        if _CALLBACK_HMAC is None:
+            logger.error("PAYMENT_CALLBACK_SECRET not configured; rejecting signed callback")
+            return False
+        
+        payload = {k: v for k, v in callback_data.items() if k != "signature"}
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        
+        mac = _CALLBACK_HMAC.copy()
+        mac.update(canonical.encode())
+        return hmac.compare_digest(mac.hexdigest().encode(), signature.encode())
 
 
 class PaymentSafetyManager:
@@ -253,15 +405,18 @@ class PaymentSafetyManager:
         self.validator = PaymentValidator()
         self.callback_validator = PaymentCallbackValidator()
         self.transactions: Dict[str, PaymentTransaction] = {}
+        # Secondary indexes so per-order lookups don't scan every transaction
+        self.by_order: Dict[str, List[str]] = {}
+        self.by_order_status: Dict[Tuple[str, PaymentStatus], int] = {}
+        # Settled transaction id -> monotonic time it settled, oldest first, for TTL eviction
+        self._settled: "OrderedDict[str, float]" = OrderedDict()
+        # Paid transactions validate_before_shipment has approved; only these may be evicted
+        self._shipment_validated: set = set()
+        # Guards the transaction map and both indexes, which must change together
+        self._lock = threading.Lock()
         
         # Allowed payment methods
-        self.allowed_methods = [
-            "CREDIT_CARD",
-            "DEBIT_CARD",
-            "UPI",
-            "NET_BANKING",
-            "WALLET"
-        ]
+        self.allowed_methods: FrozenSet[str] = frozenset(PaymentMethod)
     
     def initiate_payment(
         self,
@@ -289,8 +444,8 @@ class PaymentSafetyManager:
             Initiation result with status
         """
         logger.info(
-            f"Initiating payment: Transaction={transaction_id}, "
-            f"Order={order_id}, Amount={amount}"
+            "Initiating payment: Transaction=%s, Order=%s, Amount=%s",
+            transaction_id, order_id, amount
         )
         
         # Validate payment method
@@ -298,31 +453,130 @@ class PaymentSafetyManager:
             payment_method, self.allowed_methods
         )
         if not method_validation["valid"]:
-            return {
-                "success": False,
-                "error": method_validation["error"],
-                "message": method_validation["message"]
-            }
+            return self._initiation_rejected(method_validation)
         
         # Create transaction record
-        transaction = PaymentTransaction(
+        transaction = self._new_transaction(
+            transaction_id, order_id, user_id, amount, payment_method,
+            idempotency_key, metadata, datetime.utcnow().isoformat()
+        )
+        
+        with self._lock:
+            self._register(transaction)
+        
+        logger.info("Payment initiated successfully: %s", transaction_id)
+        
+        return self._initiation_accepted(transaction_id)
+    
+    def initiate_payments_batch(
+        self,
+        payments: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Initiate many payments in one pass (migrations, replays)
+        Same validation as initiate_payment, with one shared timestamp,
+        one index update under the lock and one summary log line
+        
+        Args:
+            payments: Dicts with initiate_payment's keyword arguments
+            
+        Returns:
+            Initiation results, in input order
+        """
+        now = datetime.utcnow().isoformat()
+        results = []
+        accepted = []
+        
+        for payment in payments:
+            method_validation = self.validator.validate_payment_method(
+                payment["payment_method"], self.allowed_methods
+            )
+            if not method_validation["valid"]:
+                results.append(self._initiation_rejected(method_validation))
+                continue
+            
+            transaction = self._new_transaction(
+                payment["transaction_id"],
+                payment["order_id"],
+                payment["user_id"],
+                payment["amount"],
+                payment["payment_method"],
+                payment["idempotency_key"],
+                payment.get("metadata"),
+                now
+            )
+            accepted.append(transaction)
+            results.append(self._initiation_accepted(transaction.transaction_id))
+        
+        with self._lock:
+            for transaction in accepted:
+                self._register(transaction)
+        
+        logger.info(
+            "Initiated %d payments (%d rejected)",
+            len(accepted), len(results) - len(accepted)
+        )
+        
+        return results
+    
+    @staticmethod
+    def _new_transaction(
+        transaction_id: str,
+        order_id: str,
+        user_id: str,
+        amount: float,
+        payment_method: str,
+        idempotency_key: str,
+        metadata: Optional[Dict],
+        now: str
+    ) -> PaymentTransaction:
+        """Build a fresh INITIATED transaction record"""
+        return PaymentTransaction(
             transaction_id=transaction_id,
             order_id=order_id,
             user_id=user_id,
             amount=amount,
-            payment_method=payment_method,
+            payment_method=PaymentMethod(payment_method),
             status=PaymentStatus.INITIATED,
             gateway_reference="",
             idempotency_key=idempotency_key,
-            created_at=datetime.utcnow().isoformat(),
-            updated_at=datetime.utcnow().isoformat(),
+            created_at=now,
+            updated_at=now,
             metadata=metadata or {}
         )
+    
+    def _register(self, transaction: PaymentTransaction):
+        """Store a new transaction and index it; caller holds self._lock"""
+        transaction_id = transaction.transaction_id
+        previous = self.transactions.get(transaction_id)
+        if previous is not None:
+            # Re-initiating an existing transaction replaces it; drop the old index entries
+            self.by_order[previous.order_id].remove(transaction_id)
+            self._count_status(previous.order_id, previous.status, -1)
+            self._shipment_validated.discard(transaction_id)
         
-        self.transactions[transaction_id] = transaction
-        
-        logger.info(f"Payment initiated successfully: {transaction_id}")
+        order_ids = self.by_order.get(transaction.order_id)
+        if order_ids:
+            # Share one order_id string across the order's transactions (bounded by
+            # eviction, unlike sys.intern, which pins strings for the process lifetime)
+            transaction.order_id = self.transactions[order_ids[0]].order_id
         
+        self.transactions[transaction_id] = transaction
+        self.by_order.setdefault(transaction.order_id, []).append(transaction_id)
+        self._count_status(transaction.order_id, PaymentStatus.INITIATED, 1)
+    
+    @staticmethod
+    def _initiation_rejected(method_validation: Mapping[str, Any]) -> Dict[str, Any]:
+        """Initiation result for a payment that failed validation"""
+        return {
+            "success": False,
+            "error": method_validation["error"],
+            "message": method_validation["message"]
+        }
+    
+    @staticmethod
+    def _initiation_accepted(transaction_id: str) -> Dict[str, Any]:
+        """Initiation result for a newly registered transaction"""
         return {
             "success": True,
             "transaction_id": transaction_id,
@@ -349,22 +603,73 @@ class PaymentSafetyManager:
             Processing result
         """
         logger.info(
-            f"Processing payment callback: Transaction={transaction_id}, "
-            f"Gateway={gateway_reference}"
+            "Processing payment callback: Transaction=%s, Gateway=%s",
+            transaction_id, gateway_reference
         )
         
         # Retrieve transaction
-        transaction = self.transactions.get(transaction_id)
-        if not transaction:
-            logger.error(f"Transaction not found: {transaction_id}")
-            return {
-                "success": False,
-                "error": "TRANSACTION_NOT_FOUND",
-                "message": "Transaction record not found",
-                "action": "REJECT_CALLBACK"
-            }
+        try:
+            transaction = self.transactions[transaction_id]
+        except KeyError:
+            return self._transaction_not_found(transaction_id)
+        
+        result = self._apply_callback(
+            transaction, callback_data, gateway_reference, datetime.utcnow().isoformat()
+        )
         
-        # Validate callback
+        if result["success"]:
+            logger.info(
+                "Payment successful: Transaction=%s, Order=%s",
+                transaction_id, transaction.order_id
+            )
+        
+        return result
+    
+    def process_payment_callbacks_batch(
+        self,
+        callbacks: List[Tuple[str, Dict[str, Any], str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Process a burst of gateway callbacks in one pass
+        Same validation as process_payment_callback, with one shared timestamp
+        and one summary log line for the whole batch
+        
+        Args:
+            callbacks: (transaction_id, callback_data, gateway_reference) tuples
+            
+        Returns:
+            Processing results, in input order
+        """
+        now = datetime.utcnow().isoformat()
+        results = []
+        succeeded = 0
+        
+        for transaction_id, callback_data, gateway_reference in callbacks:
+            try:
+                transaction = self.transactions[transaction_id]
+            except KeyError:
+                results.append(self._transaction_not_found(transaction_id))
+                continue
+            
+            result = self._apply_callback(transaction, callback_data, gateway_reference, now)
+            succeeded += result["success"]
+            results.append(result)
+        
+        logger.info(
+            "Processed %d payment callbacks (%d ok, %d failed)",
+            len(results), succeeded, len(results) - succeeded
+        )
+        
+        return results
+    
+    def _apply_callback(
+        self,
+        transaction: PaymentTransaction,
+        callback_data: Dict[str, Any],
+        gateway_reference: str,
+        now: str
+    ) -> Dict[str, Any]:
+        """Validate a callback against its transaction and record the outcome"""
         validation = self.callback_validator.validate_callback(
             callback_data=callback_data,
             expected_order_id=transaction.order_id,
@@ -374,8 +679,8 @@ class PaymentSafetyManager:
         
         if not validation["valid"]:
             # Mark transaction as failed
-            transaction.status = PaymentStatus.FAILED
-            transaction.updated_at = datetime.utcnow().isoformat()
+            self._set_status(transaction, PaymentStatus.FAILED)
+            transaction.updated_at = now
             transaction.metadata["callback_validation_errors"] = validation["errors"]
             
             return {
@@ -383,29 +688,36 @@ class PaymentSafetyManager:
                 "error": "CALLBACK_VALIDATION_FAILED",
                 "message": validation["message"],
                 "action": "ALERT_FRAUD_TEAM",
-                "details": validation["errors"]
+                "details": validation["errors"],
+                "failed_checks": validation["failed_checks"]
             }
         
         # Mark payment as successful
-        transaction.status = PaymentStatus.SUCCESS
+        self._set_status(transaction, PaymentStatus.SUCCESS)
         transaction.gateway_reference = gateway_reference
-        transaction.updated_at = datetime.utcnow().isoformat()
-        transaction.metadata["callback_processed_at"] = datetime.utcnow().isoformat()
-        
-        logger.info(
-            f"Payment successful: Transaction={transaction_id}, "
-            f"Order={transaction.order_id}"
-        )
+        transaction.updated_at = now
+        transaction.callback_processed_at = now
         
         return {
             "success": True,
-            "transaction_id": transaction_id,
+            "transaction_id": transaction.transaction_id,
             "order_id": transaction.order_id,
             "status": PaymentStatus.SUCCESS.value,
             "message": "Payment processed successfully",
             "action": "UPDATE_ORDER_STATE"
         }
     
+    @staticmethod
+    def _transaction_not_found(transaction_id: str) -> Dict[str, Any]:
+        """Rejection result for a callback whose transaction is unknown"""
+        logger.error("Transaction not found: %s", transaction_id)
+        return {
+            "success": False,
+            "error": "TRANSACTION_NOT_FOUND",
+            "message": "Transaction record not found",
+            "action": "REJECT_CALLBACK"
+        }
+    
     def validate_before_shipment(
         self,
         order_id: str
@@ -420,16 +732,13 @@ class PaymentSafetyManager:
         Returns:
             Validation result
         """
-        logger.info(f"Validating payment before shipment: Order={order_id}")
+        logger.info("Validating payment before shipment: Order=%s", order_id)
         
-        # Find transaction for this order
-        order_transactions = [
-            t for t in self.transactions.values() 
-            if t.order_id == order_id
-        ]
+        # Find transactions for this order
+        transaction_ids = self.by_order.get(order_id)
         
-        if not order_transactions:
-            logger.error(f"No payment transaction found for order: {order_id}")
+        if not transaction_ids:
+            logger.error("No payment transaction found for order: %s", order_id)
             return {
                 "validated": False,
                 "error": "NO_PAYMENT_FOUND",
@@ -438,15 +747,12 @@ class PaymentSafetyManager:
             }
         
         # Check for successful payment
-        successful_payments = [
-            t for t in order_transactions 
-            if t.status == PaymentStatus.SUCCESS
-        ]
+        success_count = self.by_order_status.get((order_id, PaymentStatus.SUCCESS), 0)
         
-        if not successful_payments:
+        if not success_count:
             logger.error(
-                f"No successful payment for order: {order_id}. "
-                f"Statuses: {[t.status for t in order_transactions]}"
+                "No successful payment for order: %s. Statuses: %s",
+                order_id, [self.transactions[tid].status.value for tid in transaction_ids]
             )
             return {
                 "validated": False,
@@ -456,24 +762,30 @@ class PaymentSafetyManager:
             }
         
         # Check for multiple successful payments (duplicate payment scenario)
-        if len(successful_payments) > 1:
+        if success_count > 1:
             logger.critical(
-                f"MULTIPLE SUCCESSFUL PAYMENTS for order: {order_id}. "
-                f"Count: {len(successful_payments)}"
+                "MULTIPLE SUCCESSFUL PAYMENTS for order: %s. Count: %d",
+                order_id, success_count
             )
             return {
                 "validated": False,
                 "error": "DUPLICATE_PAYMENT_DETECTED",
                 "message": "Multiple payments detected for this order",
                 "action": "HOLD_SHIPMENT_AND_INVESTIGATE",
-                "payment_count": len(successful_payments)
+                "payment_count": success_count
             }
         
-        payment = successful_payments[0]
+        for tid in transaction_ids:
+            payment = self.transactions[tid]
+            if payment.status is PaymentStatus.SUCCESS:
+                break
+        
+        with self._lock:
+            self._shipment_validated.add(payment.transaction_id)
         
         logger.info(
-            f"Payment validated for shipment: Order={order_id}, "
-            f"Transaction={payment.transaction_id}"
+            "Payment validated for shipment: Order=%s, Transaction=%s",
+            order_id, payment.transaction_id
         )
         
         return {
@@ -499,16 +811,94 @@ class PaymentSafetyManager:
         Returns:
             List of all payment transactions for this order
         """
-        transactions = [
-            t.to_dict() for t in self.transactions.values()
-            if t.order_id == order_id
-        ]
+        transactions = [t.to_dict() for t in self._order_transactions(order_id)]
         
         logger.info(
-            f"Retrieved {len(transactions)} transactions for order {order_id}"
+            "Retrieved %d transactions for order %s", len(transactions), order_id
         )
         
         return transactions
+    
+    def get_transaction_history_json(self, order_id: str) -> bytes:
+        """
+        Payment history for an order as a ready-to-send JSON array
+        Skips the intermediate list of dicts when responding over HTTP
+        """
+        return b"[" + b",".join(
+            t.to_json_bytes() for t in self._order_transactions(order_id)
+        ) + b"]"
+    
+    def _order_transactions(self, order_id: str) -> List[PaymentTransaction]:
+        """Transactions recorded for an order, via the by_order index"""
+        return [self.transactions[tid] for tid in self.by_order.get(order_id, [])]
+    
+    def _count_status(self, order_id: str, status: PaymentStatus, delta: int):
+        """Adjust the per-order status counter"""
+        key = (order_id, status)
+        count = self.by_order_status.get(key, 0) + delta
+        if count:
+            self.by_order_status[key] = count
+        else:
+            self.by_order_status.pop(key, None)
+    
+    def _set_status(self, transaction: PaymentTransaction, status: PaymentStatus):
+        """Change a transaction's status, keeping by_order_status in sync"""
+        with self._lock:
+            was_settled = transaction.status in _SETTLED_STATUSES
+            self._count_status(transaction.order_id, transaction.status, -1)
+            self._count_status(transaction.order_id, status, 1)
+            transaction.status = status
+            
+            now = time.monotonic()
+            if status in _SETTLED_STATUSES and not was_settled:
+                # Queued once per settlement; a re-initiated id moves to the back
+                self._settled[transaction.transaction_id] = now
+                self._settled.move_to_end(transaction.transaction_id)
+            self._evict_expired(now)
+    
+    def _evict_expired(self, now: float):
+        """Evict settled transactions past the TTL; caller holds self._lock"""
+        # Each entry is looked at once per pass, so re-queued ones can't spin
+        for _ in range(len(self._settled)):
+            transaction_id, settled_at = next(iter(self._settled.items()))
+            if now - settled_at < SETTLED_TRANSACTION_TTL_SECONDS:
+                break
+            
+            transaction = self.transactions.get(transaction_id)
+            if (
+                transaction is not None
+                and transaction.status is PaymentStatus.SUCCESS
+                and transaction_id not in self._shipment_validated
+            ):
+                # Paid but not yet approved for shipment: keep it, look again after another TTL
+                self._settled[transaction_id] = now
+                self._settled.move_to_end(transaction_id)
+                continue
+            
+            del self._settled[transaction_id]
+            self._evict(transaction_id)
+    
+    def _evict(self, transaction_id: str):
+        """Drop a settled transaction and its index entries; caller holds self._lock"""
+        self._shipment_validated.discard(transaction_id)
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None or transaction.status not in _SETTLED_STATUSES:
+            # Replaced by a re-initiated transaction that is still in flight
+            return
+        
+        if EVICTED_TRANSACTIONS_PATH:
+            try:
+                with open(EVICTED_TRANSACTIONS_PATH, "ab") as f:
+                    f.write(transaction.to_json_bytes() + b"\n")
+            except OSError as e:
+                logger.warning("Could not archive evicted transaction %s: %s", transaction_id, e)
+        
+        del self.transactions[transaction_id]
+        order_ids = self.by_order[transaction.order_id]
+        order_ids.remove(transaction_id)
+        if not order_ids:
+            del self.by_order[transaction.order_id]
+        self._count_status(transaction.order_id, transaction.status, -1)
 
 
 class RefundManager:
@@ -517,7 +907,7 @@ class RefundManager:
     """
     
     def __init__(self):
-        self.refund_records: Dict[str, Dict] = {}
+        self.refund_records: Dict[str, RefundRecord] = {}
     
     def initiate_refund(
         self,
@@ -543,36 +933,37 @@ class RefundManager:
             Refund initiation result
         """
         logger.info(
-            f"Initiating refund: ID={refund_id}, Order={order_id}, "
-            f"Amount={amount}, Type={refund_type}"
+            "Initiating refund: ID=%s, Order=%s, Amount=%s, Type=%s",
+            refund_id, order_id, amount, refund_type
         )
         
-        refund_record = {
-            "refund_id": refund_id,
-            "order_id": order_id,
-            "transaction_id": transaction_id,
-            "amount": amount,
-            "reason": reason,
-            "refund_type": refund_type,
-            "status": "INITIATED",
-            "initiated_at": datetime.utcnow().isoformat(),
-            "completed_at": None,
-            "gateway_reference": None,
-            "timeline": [
-                {
-                    "status": "INITIATED",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "notes": f"Refund initiated: {reason}"
-                }
+        now = datetime.utcnow().isoformat()
+        refund_record = RefundRecord(
+            refund_id=refund_id,
+            order_id=order_id,
+            transaction_id=transaction_id,
+            amount=amount,
+            reason=reason,
+            refund_type=refund_type,
+            status=RefundStatus.INITIATED,
+            initiated_at=now,
+            completed_at=None,
+            gateway_reference=None,
+            timeline=[
+                RefundTimelineEvent(
+                    status=RefundStatus.INITIATED,
+                    timestamp=now,
+                    notes=f"Refund initiated: {reason}"
+                )
             ]
-        }
+        )
         
         self.refund_records[refund_id] = refund_record
         
         return {
             "success": True,
             "refund_id": refund_id,
-            "status": "INITIATED",
+            "status": RefundStatus.INITIATED.value,
             "message": f"Refund of ₹{amount} initiated successfully",
             "estimated_days": "5-7 business days"
         }
@@ -596,36 +987,47 @@ class RefundManager:
         Returns:
             Update result
         """
-        if refund_id not in self.refund_records:
-            logger.error(f"Refund not found: {refund_id}")
+        try:
+            refund = self.refund_records[refund_id]
+        except KeyError:
+            logger.error("Refund not found: %s", refund_id)
             return {
                 "success": False,
                 "error": "REFUND_NOT_FOUND"
             }
         
-        refund = self.refund_records[refund_id]
-        refund["status"] = status
+        try:
+            status = RefundStatus(status)
+        except ValueError:
+            logger.error("Invalid refund status: %s", status)
+            return {
+                "success": False,
+                "error": "INVALID_REFUND_STATUS"
+            }
+        
+        now = datetime.utcnow().isoformat()
+        refund.status = status
         
         if gateway_reference:
-            refund["gateway_reference"] = gateway_reference
+            refund.gateway_reference = gateway_reference
         
-        if status == "COMPLETED":
-            refund["completed_at"] = datetime.utcnow().isoformat()
+        if status is RefundStatus.COMPLETED:
+            refund.completed_at = now
         
         # Add to timeline
-        refund["timeline"].append({
-            "status": status,
-            "timestamp": datetime.utcnow().isoformat(),
-            "notes": notes or f"Refund status updated to {status}"
-        })
+        refund.timeline.append(RefundTimelineEvent(
+            status=status,
+            timestamp=now,
+            notes=notes or f"Refund status updated to {status.value}"
+        ))
         
-        logger.info(f"Refund {refund_id} updated to {status}")
+        logger.info("Refund %s updated to %s", refund_id, status.value)
         
         return {
             "success": True,
             "refund_id": refund_id,
-            "status": status,
-            "message": f"Refund status updated to {status}"
+            "status": status.value,
+            "message": f"Refund status updated to {status.value}"
         }
     
     def get_refund_status(self, refund_id: str) -> Optional[Dict[str, Any]]:
@@ -638,7 +1040,8 @@ class RefundManager:
         Returns:
             Refund record with full timeline
         """
-        return self.refund_records.get(refund_id)
+        refund = self.refund_records.get(refund_id)
+        return refund.to_dict() if refund else None
 
 
 # Global instances
@@ -10,31 +10,55 @@ Architecture:
     User Message → Intent Detection (Vertex AI) → Router → Worker Microservice → Response
 """
 
+import asyncio
+import heapq
 import logging
 import os
-from typing import TypedDict, Literal, Optional, List, Dict, Any
+import pickle
+import threading
+import time
+from types import MappingProxyType
+from typing import TypedDict, Literal, Optional, List, Dict, Any, FrozenSet, Mapping, Tuple
 from datetime import datetime
-import requests
+from functools import lru_cache
+import httpx
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import csv
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-import orders_repository
 import json
 import sys
 
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401  (enables pandas' multithreaded pyarrow CSV engine)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Import intent detector (absolute import for direct execution)
 from vertex_intent_detector import detect_intent as vertex_detect_intent
 # Agent client (async unified client for workers)
 from agent_client import call_agent
 # Orders repository for thread-safe CSV persistence
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+_BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(_BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(_BACKEND_ROOT))
 import orders_repository
-    # ...existing code...
 
 # Load environment
 load_dotenv()
@@ -42,18 +66,87 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-    # ...existing code...
+# Parsed CSVs are pickled here so restarts skip re-parsing unchanged files
+_CSV_CACHE_DIR = Path(os.getenv("SALES_AGENT_CSV_CACHE_DIR", Path(__file__).parent / ".csv_cache"))
+
+
+def _read_csv_cached(csv_path: Path, columns: FrozenSet[str], dtype: Optional[type] = None) -> pd.DataFrame:
+    """
+    Read the given columns of a CSV, reusing a pickled copy while the file is unchanged.
+    The cache is keyed on the CSV's mtime and size plus the column selection and dtype.
+    """
+    stat = csv_path.stat()
+    key = (stat.st_mtime_ns, stat.st_size, tuple(sorted(columns)), getattr(dtype, "__name__", None))
+    cache_path = _CSV_CACHE_DIR / f"{csv_path.stem}.pkl"
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_key, df = pickle.load(f)
+        if cached_key == key:
+            return df
+    except Exception:
+        pass
+
+    if PYARROW_AVAILABLE:
+        # The pyarrow engine only materializes the selected columns; it needs
+        # them listed, so intersect with the header rather than a callable
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), [])
+        df = pd.read_csv(
+            csv_path,
+            engine="pyarrow",
+            usecols=[c for c in header if c in columns],
+            dtype=dtype,
+        )
+    else:
+        df = pd.read_csv(csv_path, usecols=lambda c: c in columns, dtype=dtype)
+    try:
+        _CSV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug("Could not write CSV cache %s: %s", cache_path, e)
+    return df
+
 
 # Load customer phone-to-ID mapping
+_CUSTOMER_COLUMNS = frozenset({'phone_number', 'customer_id'})
+# Parsed catalog frames; stay None when the CSV is missing or fails to load
+customers_df: Optional[pd.DataFrame] = None
+products_df: Optional[pd.DataFrame] = None
 _customer_phone_map = {}
 _product_name_to_sku = {}
+# Column views and word sets of _product_name_to_sku (same order) for partial matching
+_product_names = pd.Series([], dtype=object)
+_product_name_lens = np.empty(0)
+_product_skus = np.empty(0, dtype=object)
+_product_token_sets: List[FrozenSet[str]] = []
+# Aho-Corasick automaton over product names (value = column index); None without pyahocorasick
+_product_name_automaton = None
+# First of the known price columns present in products_df, and its values parsed
+# once to floats (NaN where unparseable) for the fallback budget filter
+_products_price_col: Optional[str] = None
+_products_price = pd.Series([], dtype='float64')
+# SKU and display-name columns of products_df (first of the spellings seen in catalog exports)
+_products_sku_col: Optional[str] = None
+_products_name_col: Optional[str] = None
+# Keyword alternations for the fallback product_type filter (substring match on the name)
+_PRODUCT_TYPE_PATTERNS = {
+    'footwear': 'shoe|footwear',
+    'apparel': 'shirt|tshirt|jacket|top|coat',
+}
+# Row masks of products_df per product_type, built once at load
+_product_type_masks: Dict[str, np.ndarray] = {}
 try:
     customers_csv = Path(__file__).parent.parent.parent.parent / 'backend' / 'data' / 'customers.csv'
     if customers_csv.exists():
-        customers_df = pd.read_csv(customers_csv)
+        # Read as text so the phone/customer ID keys need no per-cell conversion
+        customers_df = _read_csv_cached(customers_csv, _CUSTOMER_COLUMNS, dtype=str)
         _customer_phone_map = dict(zip(
-            customers_df['phone_number'].astype(str), 
-            customers_df['customer_id'].astype(str)
+            customers_df['phone_number'], 
+            customers_df['customer_id']
         ))
         logger.info(f"✅ Loaded {len(_customer_phone_map)} customer phone mappings")
     else:
@@ -61,11 +154,21 @@ try:
 except Exception as e:
     logger.warning(f"⚠️  Could not load customer mappings: {e}")
 
+# Only the columns the orchestrator reads (name/SKU lookup, CSV fallback
+# recommendations, UI links) are kept; both CSV schemas are covered.
+_PRODUCT_COLUMNS = frozenset({
+    'sku', 'SKU', 'Sku',
+    'ProductDisplayName', 'product_display_name', 'name',
+    'subcategory', 'sub_category',
+    'price', 'mrp', 'MRP', 'Price',
+    'image', 'image_url', 'product_url',
+})
+
 # Load product name-to-SKU mapping
 try:
     products_csv = Path(__file__).parent.parent.parent.parent / 'backend' / 'data' / 'products.csv'
     if products_csv.exists():
-        products_df = pd.read_csv(products_csv)
+        products_df = _read_csv_cached(products_csv, _PRODUCT_COLUMNS)
         # Normalize column names for new CSV schema
         if "product_display_name" in products_df.columns and "ProductDisplayName" not in products_df.columns:
             products_df = products_df.rename(columns={"product_display_name": "ProductDisplayName"})
@@ -83,6 +186,41 @@ try:
             products_df['ProductDisplayName'].str.lower(), 
             products_df['sku']
         ))
+        # Display names repeat heavily, so match the patterns once per distinct
+        # lowercased name and spread the result back over the rows. Missing names
+        # become '' (matches nothing) and get a real code rather than the -1
+        # sentinel, which would index the last distinct name's result.
+        name_codes, distinct_names = pd.factorize(
+            products_df['ProductDisplayName'].fillna('').astype(str).str.lower(),
+            use_na_sentinel=False,
+        )
+        _product_type_masks = {
+            ptype: (
+                pd.Series(distinct_names, dtype=object).str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)[name_codes]
+                if len(distinct_names) else np.zeros(len(products_df), dtype=bool)
+            )
+            for ptype, pattern in _PRODUCT_TYPE_PATTERNS.items()
+        }
+        # Probe the candidate column spellings once against a set of the columns
+        product_columns = set(products_df.columns)
+        _products_sku_col = next((c for c in ('sku', 'SKU', 'Sku') if c in product_columns), None)
+        _products_name_col = next((c for c in ('ProductDisplayName', 'name') if c in product_columns), None)
+        _products_price_col = next((c for c in ('price', 'mrp', 'MRP', 'Price') if c in product_columns), None)
+        if _products_price_col:
+            _products_price = pd.to_numeric(products_df[_products_price_col], errors='coerce')
+        _product_names = pd.Series(list(_product_name_to_sku), dtype=object)
+        _product_name_lens = _product_names.str.len().to_numpy()
+        _product_skus = np.array(list(_product_name_to_sku.values()), dtype=object)
+        _product_token_sets = [
+            frozenset(name.split()) if isinstance(name, str) else frozenset()
+            for name in _product_name_to_sku
+        ]
+        if AHOCORASICK_AVAILABLE and _product_name_to_sku:
+            _product_name_automaton = ahocorasick.Automaton()
+            for i, name in enumerate(_product_name_to_sku):
+                if isinstance(name, str) and name:
+                    _product_name_automaton.add_word(name, i)
+            _product_name_automaton.make_automaton()
         logger.info(f"✅ Loaded {len(_product_name_to_sku)} product name mappings")
     else:
         logger.warning("⚠️  products.csv not found, SKU resolution will fail")
@@ -90,7 +228,7 @@ except Exception as e:
     logger.warning(f"⚠️  Could not load product mappings: {e}")
 
 # Microservice URLs
-WORKER_SERVICES = {
+WORKER_SERVICES: Mapping[str, str] = MappingProxyType({
     "recommendation": "http://localhost:8008",  # Matches recommendation/app.py uvicorn port
     "inventory": "http://localhost:8001",
     "payment": "http://localhost:8003",
@@ -100,10 +238,93 @@ WORKER_SERVICES = {
     "stylist": "http://localhost:8006",
     "virtual_circles": "http://localhost:8009",  # Virtual Circles (Community Chat)
     "ambient_commerce": os.getenv("AMBIENT_COMMERCE_URL", "http://localhost:8017"),
-}
+})
 
 WORKER_TIMEOUT_SECONDS = int(os.getenv("SALES_AGENT_WORKER_TIMEOUT", "25"))
 
+# Shared async client for worker calls, so they no longer block the event loop
+# and reuse keep-alive connections; closed by the app's lifespan handler.
+_worker_client = httpx.AsyncClient(
+    timeout=WORKER_TIMEOUT_SECONDS,
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+
+async def close_worker_client() -> None:
+    """Close the shared worker HTTP client."""
+    await _worker_client.aclose()
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a worker request body to JSON bytes, with orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Parse a worker response body, with orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Caps concurrent /recommend calls when a comparison fans out
+_RECOMMEND_FANOUT = asyncio.Semaphore(8)
+# Entities a comparison can list several values for; the recommendation
+# worker filters on one category/subcategory per call
+_COMPARISON_KEYS = ("subcategory", "category")
+
+# Short-lived stock cache so bursts of "is X in stock?" for the same SKU
+# share one inventory call: sku -> (expires_at monotonic, response data)
+INVENTORY_CACHE_TTL_SECONDS = float(os.getenv("SALES_AGENT_INVENTORY_CACHE_TTL", "5"))
+INVENTORY_CACHE_MAX_ENTRIES = 1024
+_inventory_cache: Dict[str, tuple] = {}
+
+
+async def _get_stock(sku: str, fresh: bool = False) -> Dict[str, Any]:
+    """Fetch stock for a SKU from the inventory worker, served from the TTL cache unless fresh"""
+    now = time.monotonic()
+    if not fresh:
+        cached = _inventory_cache.get(sku)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    response = await _worker_client.get(
+        f"{WORKER_SERVICES['inventory']}/inventory/{sku}",
+        timeout=5
+    )
+    response.raise_for_status()
+    data = _loads(response.content)
+
+    if len(_inventory_cache) >= INVENTORY_CACHE_MAX_ENTRIES:
+        # Drop expired entries first, then the oldest insertions
+        for key in [k for k, (expires, _) in _inventory_cache.items() if expires <= now]:
+            del _inventory_cache[key]
+        while len(_inventory_cache) >= INVENTORY_CACHE_MAX_ENTRIES:
+            del _inventory_cache[next(iter(_inventory_cache))]
+    _inventory_cache[sku] = (now + INVENTORY_CACHE_TTL_SECONDS, data)
+    return data
+
+# Bulk availability entries from verify_inventory, kept very briefly so repeated
+# checkouts of hot SKUs skip the inventory call: sku -> (expires_at monotonic, entry).
+# Holds are never cached; the low TTL bounds how stale an availability answer can be.
+AVAILABILITY_CACHE_TTL_SECONDS = float(os.getenv("SALES_AGENT_AVAILABILITY_CACHE_TTL", "1.5"))
+AVAILABILITY_CACHE_MAX_ENTRIES = 4096
+_availability_cache: Dict[str, tuple] = {}
+
+# User-facing text for each fulfillment status (order tracking replies)
+ORDER_STATUS_MESSAGES = {
+    'PROCESSING': '📦 Your order is being processed and packed.',
+    'PACKED': '✅ Your order has been packed and is ready for shipment.',
+    'SHIPPED': '🚚 Your order has been shipped!',
+    'OUT_FOR_DELIVERY': '🏃 Your order is out for delivery!',
+    'DELIVERED': '🎉 Your order has been delivered!'
+}
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -142,10 +363,13 @@ def infer_gender_from_relation(relation: str) -> str:
     else:
         return 'unisex'
 
+@lru_cache(maxsize=4096)
 def resolve_product_to_sku(product_identifier: str) -> Optional[str]:
     """
     Resolve product name or SKU to actual SKU.
     
+    The catalog is loaded once at import, so results are cached per identifier.
+    
     Args:
         product_identifier: Product name or SKU
         
@@ -153,7 +377,7 @@ def resolve_product_to_sku(product_identifier: str) -> Optional[str]:
         SKU string if found, None otherwise
     """
     # If it's already a SKU format, return as-is
-    if product_identifier.upper().startswith('SKU'):
+    if product_identifier[:3].upper() == 'SKU':
         return product_identifier.upper()
     
     # Try to find by product name (case-insensitive)
@@ -165,34 +389,41 @@ def resolve_product_to_sku(product_identifier: str) -> Optional[str]:
         logger.info(f"📦 Exact match: '{product_identifier}' → {sku}")
         return sku
     
-    # Partial match - collect all matches and score them
+    # Partial match - score candidates as (-score, name length, index) so the
+    # smallest tuple is the best match; names/SKUs are only looked up for winners
     matches = []
     search_words = set(product_lower.split())
+    token_sets = _product_token_sets
     
-    for name, sku in _product_name_to_sku.items():
-        name_words = set(name.split())
-        
-        # Calculate match score
-        if product_lower in name:
-            # User query is substring of product name
-            common_words = search_words & name_words
-            score = len(common_words) * 2 + len(product_lower)  # Prefer more word matches
-            matches.append((score, name, sku, len(name)))
-        elif name in product_lower:
-            # Product name is substring of user query
-            common_words = search_words & name_words
-            score = len(common_words) * 2
-            matches.append((score, name, sku, len(name)))
+    # User query is substring of product name: one vectorized scan
+    in_name = _product_names.str.contains(product_lower, regex=False, na=False).to_numpy()
+    base_score = len(product_lower)
+    for i in np.flatnonzero(in_name).tolist():
+        # Prefer more word matches
+        matches.append((-(len(search_words & token_sets[i]) * 2 + base_score), _product_name_lens[i], i))
+    
+    # Product name is substring of user query: one automaton pass over the query
+    # when available, else only names no longer than the query can be
+    if _product_name_automaton is not None:
+        inside = sorted({i for _, i in _product_name_automaton.iter(product_lower)})
+    else:
+        could_be_inside = ~in_name & (_product_name_lens <= len(product_lower))
+        inside = [i for i in np.flatnonzero(could_be_inside).tolist() if _product_names.iat[i] in product_lower]
+    for i in inside:
+        if in_name[i]:
+            continue
+        matches.append((-(len(search_words & token_sets[i]) * 2), _product_name_lens[i], i))
     
     if matches:
-        # Sort by score (desc), then by name length (asc) - prefer better matches with shorter names
-        matches.sort(key=lambda x: (-x[0], x[3]))
-        best_score, best_name, best_sku, _ = matches[0]
-        logger.info(f"📦 Best match: '{product_identifier}' → {best_sku} ('{best_name}', score: {best_score})")
+        # Best score (desc), then shortest name; min keeps the first of equal matches like a stable sort
+        neg_score, _, best = min(matches, key=lambda m: (m[0], m[1]))
+        best_sku = _product_skus[best]
+        logger.info(f"📦 Best match: '{product_identifier}' → {best_sku} ('{_product_names.iat[best]}', score: {-neg_score})")
         
         # Log other candidates for debugging
-        if len(matches) > 1:
-            logger.debug(f"   Other matches: {[(m[1], m[2]) for m in matches[1:4]]}")
+        if len(matches) > 1 and logger.isEnabledFor(logging.DEBUG):
+            runners_up = heapq.nsmallest(4, matches, key=lambda m: (m[0], m[1]))[1:]
+            logger.debug(f"   Other matches: {[(_product_names.iat[m[2]], _product_skus[m[2]]) for m in runners_up]}")
         
         return best_sku
     
@@ -206,52 +437,40 @@ def resolve_product_to_sku(product_identifier: str) -> Optional[str]:
 async def fallback_recommendations(intent: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
     """Return simple CSV-based recommendations as a fallback when workers are unavailable."""
     try:
-        if 'products_df' not in globals() or products_df is None:
+        if products_df is None:
             return []
 
-        df = products_df.copy()
+        # Combine the filters as one positional mask over the catalog, then keep
+        # only the first `limit` hits (simple deterministic ordering)
+        mask = np.ones(len(products_df), dtype=bool)
 
         # Filter by product_type if provided
         ptype = intent.get('product_type')
-        if ptype:
-            if ptype == 'footwear':
-                df = df[df.apply(lambda r: 'shoe' in str(r.get('ProductDisplayName','')).lower() or 'footwear' in str(r.get('ProductDisplayName','')).lower(), axis=1)]
-            elif ptype == 'apparel':
-                df = df[df.apply(lambda r: any(w in str(r.get('ProductDisplayName','')).lower() for w in ['shirt','tshirt','jacket','top','coat']), axis=1)]
+        if ptype in _product_type_masks:
+            mask &= _product_type_masks[ptype]
 
         # Price filter
         max_price = intent.get('max_price') or intent.get('budget')
         if max_price:
             try:
                 maxp = float(max_price)
-                # try common price columns
-                price_col = None
-                for c in ['price','mrp','MRP','Price']:
-                    if c in df.columns:
-                        price_col = c
-                        break
-                if price_col:
-                    df = df[pd.to_numeric(df[price_col], errors='coerce') <= maxp]
+                if _products_price_col:
+                    mask &= (_products_price <= maxp).to_numpy()
             except Exception:
                 pass
 
-        if df.empty:
+        idx = np.flatnonzero(mask)[:limit]
+        if not idx.size:
             return []
-
-        # Take top N results (simple deterministic ordering)
-        df = df.head(limit)
-
-        results: List[Dict[str, Any]] = []
-        for _, row in df.iterrows():
-            results.append({
-                'sku': row.get('sku') or row.get('SKU') or row.get('Sku'),
-                'name': row.get('ProductDisplayName') or row.get('name') or '',
-                'price': float(row.get('price') or row.get('MRP') or 0),
-                'personalized_reason': 'Recommended based on your query',
-                # ...existing code...
-            })
-
-        return results
+        df = products_df.iloc[idx]
+
+        out = pd.DataFrame({
+            'sku': df[_products_sku_col] if _products_sku_col else None,
+            'name': df[_products_name_col] if _products_name_col else '',
+            'price': _products_price.iloc[idx].fillna(0.0) if _products_price_col else 0.0,
+            'personalized_reason': 'Recommended based on your query',
+        }, index=df.index)
+        return out.to_dict('records')
     except Exception as e:
         logger.warning(f"Fallback recommendations failed: {e}")
         return []
@@ -267,8 +486,8 @@ class SalesOrchestrator:
 
     def __init__(self):
         # Use the CSVs already loaded (products_df / customers_df)
-        self.products = globals().get('products_df', None)
-        self.customers = globals().get('customers_df', None)
+        self.products = products_df
+        self.customers = customers_df
 
     async def get_recommendations(self, user_id: str, intent: Dict[str, Any], context: Dict[str, Any]) -> List[Dict[str, Any]]:
         # Prefer calling the recommendation worker; fall back to CSV recommendations
@@ -287,49 +506,105 @@ class SalesOrchestrator:
         return await fallback_recommendations(intent, limit=context.get('limit', 5) if context else 5)
 
     async def verify_inventory(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Check availability for a list of items using the inventory agent."""
+        """Check availability for a list of items with one bulk inventory call."""
         results = {'all_available': True, 'items': [], 'low_stock_alerts': []}
-        for item in items:
-            sku = item.get('sku') or resolve_product_to_sku(item.get('product_name',''))
-            qty = int(item.get('quantity', 1))
+        requested = [
+            (item.get('sku') or resolve_product_to_sku(item.get('product_name','')), int(item.get('quantity', 1)))
+            for item in items
+        ]
+        now = time.monotonic()
+        stock: Dict[str, Any] = {}
+        missing: List[str] = []
+        for sku, _ in requested:
+            cached = _availability_cache.get(sku)
+            if cached and cached[0] > now:
+                stock[sku] = cached[1]
+            elif sku not in missing:
+                missing.append(sku)
+
+        if missing:
             try:
-                inv = await call_agent('inventory', {'sku': sku})
-                available = False
-                if isinstance(inv, dict):
-                    if 'available' in inv:
-                        available = bool(inv.get('available'))
-                    else:
-                        # try numeric stock fields
-                        total = inv.get('total_stock') or inv.get('online_stock') or 0
-                        available = int(total) >= qty
-
-                results['items'].append({'sku': sku, 'requested': qty, 'available': available})
-                if not available:
-                    results['all_available'] = False
-                # low-stock heuristic
-                try:
-                    total_stock = int(inv.get('total_stock', 0) or inv.get('online_stock', 0) or 0)
-                    if total_stock > 0 and total_stock < 5:
-                        results['low_stock_alerts'].append({'sku': sku, 'stock': total_stock})
-                except Exception:
-                    pass
+                resp = await call_agent('inventory', {'skus': missing})
+                fetched = resp.get('items', {}) if isinstance(resp, dict) else {}
             except Exception as e:
-                results['items'].append({'sku': sku, 'requested': qty, 'available': False, 'error': str(e)})
+                for sku, qty in requested:
+                    results['items'].append({'sku': sku, 'requested': qty, 'available': False, 'error': str(e)})
+                results['all_available'] = False
+                return results
+
+            stock.update(fetched)
+            if len(_availability_cache) >= AVAILABILITY_CACHE_MAX_ENTRIES:
+                for key in [k for k, (expires, _) in _availability_cache.items() if expires <= now]:
+                    del _availability_cache[key]
+            if len(_availability_cache) < AVAILABILITY_CACHE_MAX_ENTRIES:
+                expires_at = now + AVAILABILITY_CACHE_TTL_SECONDS
+                for sku in missing:
+                    if isinstance(fetched.get(sku), dict):
+                        _availability_cache[sku] = (expires_at, fetched[sku])
+
+        for sku, qty in requested:
+            inv = stock.get(sku)
+            available = False
+            if isinstance(inv, dict):
+                if 'available' in inv:
+                    available = bool(inv.get('available'))
+                else:
+                    # try numeric stock fields
+                    total = inv.get('total_stock') or inv.get('online_stock') or 0
+                    available = int(total) >= qty
+
+            results['items'].append({'sku': sku, 'requested': qty, 'available': available})
+            if not available:
                 results['all_available'] = False
+            # low-stock heuristic
+            try:
+                total_stock = int(inv.get('total_stock', 0) or inv.get('online_stock', 0) or 0)
+                if total_stock > 0 and total_stock < 5:
+                    results['low_stock_alerts'].append({'sku': sku, 'stock': total_stock})
+            except Exception:
+                pass
 
         return results
 
     async def create_inventory_holds(self, items: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
-        holds = []
-        for item in items:
-            sku = item.get('sku')
-            qty = int(item.get('quantity', 1))
+        # Resolve SKUs the same way verify_inventory does; items that still can't
+        # form a valid hold are reported individually and kept out of the batch
+        requested = [
+            {'sku': item.get('sku') or resolve_product_to_sku(item.get('product_name', '')), 'quantity': int(item.get('quantity', 1))}
+            for item in items
+        ]
+        invalid = {}
+        for i, h in enumerate(requested):
+            if not h['sku']:
+                invalid[i] = 'missing sku'
+            elif h['quantity'] <= 0:
+                invalid[i] = 'quantity must be positive'
+        valid = [h for i, h in enumerate(requested) if i not in invalid]
+
+        created: List[Any] = []
+        error = None
+        if valid:
             try:
-                # Best-effort: ask inventory agent to create a hold
-                resp = await call_agent('inventory', {'action': 'hold', 'sku': sku, 'quantity': qty, 'session_id': session_id})
-                holds.append({'sku': sku, 'hold': resp})
+                # Best-effort: ask inventory agent to create all valid holds in one call
+                resp = await call_agent('inventory', {'action': 'hold_bulk', 'holds': valid, 'session_id': session_id})
+                created = resp.get('holds', []) if isinstance(resp, dict) else []
             except Exception as e:
-                holds.append({'sku': sku, 'error': str(e)})
+                error = str(e)
+
+        holds = []
+        created_iter = iter(created)
+        for i, h in enumerate(requested):
+            if i in invalid:
+                holds.append({'sku': h['sku'], 'error': invalid[i]})
+                continue
+            if error is not None:
+                holds.append({'sku': h['sku'], 'error': error})
+                continue
+            hold = next(created_iter, None)
+            if isinstance(hold, dict) and hold.get('status') != 'failed':
+                holds.append({'sku': h['sku'], 'hold': hold})
+            else:
+                holds.append({'sku': h['sku'], 'error': (hold or {}).get('error', 'hold not created')})
         return holds
 
     async def process_payment(self, customer_id: str, order_total: float, payment_method: Dict[str, Any]) -> Dict[str, Any]:
@@ -346,13 +621,41 @@ class SalesOrchestrator:
         except Exception as e:
             return {'status': 'failed', 'error': str(e)}
 
+    async def _calculate_discounts(self, customer_id: str, original_total: float) -> Tuple[float, str]:
+        """Apply automatic discounts via the loyalty service; returns (final total, applied discounts)."""
+        try:
+            response = await _worker_client.post(
+                f"{WORKER_SERVICES['loyalty']}/loyalty/calculate-discounts",
+                content=_dumps({"user_id": customer_id, "cart_total": original_total}),
+                headers=_JSON_HEADERS,
+                timeout=5,
+            )
+            response.raise_for_status()
+            discount_data = _loads(response.content)
+            return (
+                discount_data.get('final_total', original_total),
+                discount_data.get('message', 'No discounts applied'),
+            )
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to calculate discounts: {e}")
+            return original_total, 'Discount calculation failed'
+
     async def complete_purchase_flow(self, customer_id: str, items: List[Dict[str, Any]], payment_method: Dict[str, Any], shipping_address: Dict[str, Any]) -> Dict[str, Any]:
         """Minimal end-to-end flow: verify inventory -> create holds -> process payment -> start fulfillment."""
-        flow = {'status': 'initiated', 'steps': {}, 'order_id': f"ORD-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{customer_id[:8]}"}
+        # One clock read names the order and stamps its record
+        started_at = datetime.utcnow()
+        flow = {'status': 'initiated', 'steps': {}, 'order_id': f"ORD-{started_at:%Y%m%d%H%M%S}-{customer_id[:8]}"}
+        # (unit price, quantity) parsed once per item for the total and the order record
+        item_lines = [(float(i.get('price', 0)), int(i.get('quantity', 1))) for i in items]
+        original_total = sum(unit_price * qty for unit_price, qty in item_lines)
+        # Discounts depend only on the cart, so price them while inventory is verified and held
+        discount_task = asyncio.create_task(self._calculate_discounts(customer_id, original_total))
+
         # 1) verify
         ver = await self.verify_inventory(items)
         flow['steps']['verify_inventory'] = ver
         if not ver.get('all_available'):
+            discount_task.cancel()
             flow['status'] = 'failed'
             return flow
 
@@ -360,26 +663,8 @@ class SalesOrchestrator:
         holds = await self.create_inventory_holds(items, session_id=flow['order_id'])
         flow['steps']['holds'] = holds
 
-        # 3) calculate discounted total with loyalty and coupons
-        original_total = sum([float(i.get('price', 0)) * int(i.get('quantity', 1)) for i in items])
-        
-        # Apply automatic discounts via loyalty service
-        try:
-            discount_url = f"{WORKER_SERVICES['loyalty']}/loyalty/calculate-discounts"
-            discount_payload = {
-                "user_id": customer_id,
-                "cart_total": original_total
-            }
-            discount_response = requests.post(discount_url, json=discount_payload, timeout=5)
-            discount_response.raise_for_status()
-            discount_data = discount_response.json()
-            
-            discounted_total = discount_data.get('final_total', original_total)
-            applied_discounts = discount_data.get('message', 'No discounts applied')
-        except Exception as e:
-            logger.warning(f"⚠️  Failed to calculate discounts: {e}")
-            discounted_total = original_total
-            applied_discounts = 'Discount calculation failed'
+        # 3) discounted total with loyalty and coupons
+        discounted_total, applied_discounts = await discount_task
         
         # 4) process payment with discounted amount
         payment_resp = await self.process_payment(customer_id, discounted_total, payment_method)
@@ -392,9 +677,6 @@ class SalesOrchestrator:
             if inventory_hold_id:
                 break
 
-        # 3) process payment
-        total = sum([float(i.get('price', 0)) * int(i.get('quantity', 1)) for i in items])
-        payment_resp = await self.process_payment(customer_id, total, payment_method)
         flow['steps']['payment'] = payment_resp
         flow['steps']['discounts'] = {
             'original_total': original_total,
@@ -411,10 +693,8 @@ class SalesOrchestrator:
         try:
             # Build items payload matching orders.csv schema
             csv_items: List[Dict[str, Any]] = []
-            for it in items:
+            for it, (unit_price, qty) in zip(items, item_lines):
                 sku = it.get('sku') or it.get('product_sku') or it.get('id')
-                qty = int(it.get('quantity', 1))
-                unit_price = float(it.get('price', 0))
                 csv_items.append({
                     'sku': sku,
                     'qty': qty,
@@ -423,14 +703,14 @@ class SalesOrchestrator:
                 })
 
             status = 'placed'
-            created_at = datetime.utcnow().isoformat()
+            created_at = started_at.isoformat()
 
-            # Upsert to CSV safely with thread lock
-            orders_repository.upsert_order_record({
+            # Upsert to CSV safely with thread lock, off the event loop
+            await asyncio.to_thread(orders_repository.upsert_order_record, {
                 'order_id': flow['order_id'],
                 'customer_id': str(customer_id),
                 'items': csv_items,
-                'total_amount': round(total, 2),
+                'total_amount': round(discounted_total, 2),
                 'status': status,
                 'created_at': created_at
             })
@@ -449,7 +729,7 @@ class SalesOrchestrator:
                 'shipping_address': shipping_address,
                 'inventory_status': 'RESERVED',
                 'payment_status': 'SUCCESS',
-                'amount': total,
+                'amount': discounted_total,
                 'inventory_hold_id': inventory_hold_id,
                 'payment_transaction_id': payment_txn,
             })
@@ -627,6 +907,24 @@ async def detect_intent_node(state: SalesAgentState) -> SalesAgentState:
 # NODE 2: ROUTER (BASED ON INTENT)
 # ============================================================================
 
+# Intent to worker mapping
+_INTENT_TO_WORKER: Mapping[str, str] = MappingProxyType({
+    "recommendation": "recommendation_worker",
+    "gifting": "recommendation_worker",  # Gifting uses recommendation service
+    "inventory": "inventory_worker",
+    "payment": "payment_worker",
+    "loyalty": "loyalty_worker",  # Loyalty points and coupons
+    "comparison": "recommendation_worker",  # Comparison uses recommendation
+    "trend": "recommendation_worker",  # Trends use recommendation
+    "ambient_commerce": "ambient_commerce_worker",
+    # Route order tracking and support to fulfillment (not post-purchase)
+    "support": "fulfillment_worker",
+    "social_validation": "virtual_circles_worker",  # Community chat & insights
+    "community": "virtual_circles_worker",  # Community features
+    "fallback": "fallback_worker",
+})
+
+
 def route_by_intent(state: SalesAgentState) -> Literal[
     "recommendation_worker",
     "inventory_worker",
@@ -654,24 +952,7 @@ def route_by_intent(state: SalesAgentState) -> Literal[
     intent = state["intent"]
     logger.info(f"🔀 Routing intent '{intent}' to worker...")
     
-    # Intent to worker mapping
-    intent_mapping = {
-        "recommendation": "recommendation_worker",
-        "gifting": "recommendation_worker",  # Gifting uses recommendation service
-        "inventory": "inventory_worker",
-        "payment": "payment_worker",
-        "loyalty": "loyalty_worker",  # Loyalty points and coupons
-        "comparison": "recommendation_worker",  # Comparison uses recommendation
-        "trend": "recommendation_worker",  # Trends use recommendation
-        "ambient_commerce": "ambient_commerce_worker",
-        # Route order tracking and support to fulfillment (not post-purchase)
-        "support": "fulfillment_worker",
-        "social_validation": "virtual_circles_worker",  # Community chat & insights
-        "community": "virtual_circles_worker",  # Community features
-        "fallback": "fallback_worker",
-    }
-    
-    worker = intent_mapping.get(intent, "fallback_worker")
+    worker = _INTENT_TO_WORKER.get(intent, "fallback_worker")
     logger.info(f"✅ Routing to: {worker}")
     
     return worker
@@ -681,6 +962,23 @@ def route_by_intent(state: SalesAgentState) -> Literal[
 # WORKER NODES: CALL MICROSERVICES
 # ============================================================================
 
+def _comparison_candidates(entities: Dict[str, Any]) -> List[tuple]:
+    """Return (entity_key, value) pairs when a comparison names several categories."""
+    for key in _COMPARISON_KEYS:
+        values = entities.get(key)
+        if isinstance(values, list) and len(values) > 1:
+            return [(key, value) for value in dict.fromkeys(values)]
+    return []
+
+
+async def _post_recommend(endpoint: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """POST one /recommend request and return its recommended products."""
+    async with _RECOMMEND_FANOUT:
+        response = await _worker_client.post(endpoint, content=_dumps(payload), headers=_JSON_HEADERS)
+    response.raise_for_status()
+    return _loads(response.content).get("recommended_products", [])
+
+
 async def call_recommendation_worker(state: SalesAgentState) -> SalesAgentState:
     """Call recommendation microservice."""
     logger.info("📞 Calling Recommendation Worker...")
@@ -744,15 +1042,34 @@ async def call_recommendation_worker(state: SalesAgentState) -> SalesAgentState:
         logger.info(f"🔍 Recommendation payload: {payload}")
         logger.info(f"⏳ Recommendation worker timeout: {WORKER_TIMEOUT_SECONDS}s")
         
-        # Call microservice
-        response = requests.post(endpoint, json=payload, timeout=WORKER_TIMEOUT_SECONDS)
-        response.raise_for_status()
+        # Call microservice; a comparison across several categories issues one
+        # request per category concurrently and merges them in the order asked
+        candidates = _comparison_candidates(payload["intent"]) if state["intent"] == "comparison" else []
+        if candidates:
+            results = await asyncio.gather(
+                *(_post_recommend(endpoint, {**payload, "intent": {**payload["intent"], key: value}})
+                  for key, value in candidates),
+                return_exceptions=True
+            )
+            failures = [result for result in results if isinstance(result, Exception)]
+            if len(failures) == len(results):
+                raise failures[0]
+            
+            recommendations = []
+            seen_skus = set()
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning(f"⚠️  Comparison recommendation call failed: {result}")
+                    continue
+                for item in result:
+                    if item.get("sku") not in seen_skus:
+                        seen_skus.add(item.get("sku"))
+                        recommendations.append(item)
+        else:
+            recommendations = await _post_recommend(endpoint, payload)
         
-        data = response.json()
-        logger.info(f"📥 Recommendation response: {len(data.get('recommended_products', []))} products")
+        logger.info(f"📥 Recommendation response: {len(recommendations)} products")
         
-        # Format response - CHECK THE CORRECT KEY NAME
-        recommendations = data.get("recommended_products", [])  # Changed from "recommendations"
         if recommendations:
             state["response"] = f"I found {len(recommendations)} great options for you! "
             state["cards"] = [
@@ -809,14 +1126,8 @@ async def call_inventory_worker(state: SalesAgentState) -> SalesAgentState:
         
         logger.info(f"🔍 Checking inventory for SKU: {sku}")
         
-        # Check stock
-        response = requests.get(
-            f"{state['worker_url']}/inventory/{sku}",
-            timeout=5
-        )
-        response.raise_for_status()
-        
-        data = response.json()
+        # Check stock ("fresh" skips the short-lived stock cache)
+        data = await _get_stock(sku, fresh=bool(state["entities"].get("fresh")))
         
         # Response format: {sku, online_stock, store_stock, total_stock}
         total_stock = data.get("total_stock", 0)
@@ -871,7 +1182,7 @@ async def call_ambient_commerce_worker(state: SalesAgentState) -> SalesAgentStat
             filename = image_file.name
             file_bytes = image_file.read_bytes()
         else:
-            response = requests.get(image_url, timeout=10)
+            response = await _worker_client.get(image_url, timeout=10, follow_redirects=True)
             response.raise_for_status()
             file_bytes = response.content
 
@@ -879,13 +1190,13 @@ async def call_ambient_commerce_worker(state: SalesAgentState) -> SalesAgentStat
             "file": (filename, file_bytes, "application/octet-stream")
         }
 
-        response = requests.post(
+        response = await _worker_client.post(
             f"{state['worker_url']}/search/upload",
             files=files,
             timeout=WORKER_TIMEOUT_SECONDS
         )
         response.raise_for_status()
-        data = response.json()
+        data = _loads(response.content)
 
         if not data.get("success"):
             state["response"] = data.get("message", "I couldn't find a close visual match.")
@@ -1002,7 +1313,7 @@ async def call_payment_worker(state: SalesAgentState) -> SalesAgentState:
                             'line_total': round(unit_price * qty, 2)
                         })
                     
-                    orders_repository.upsert_order_record({
+                    await asyncio.to_thread(orders_repository.upsert_order_record, {
                         'order_id': order_id,
                         'customer_id': str(customer_id),
                         'items': csv_items,
@@ -1070,10 +1381,10 @@ async def call_loyalty_worker(state: SalesAgentState) -> SalesAgentState:
         
         # Get user's complete tier information (points + tier + benefits)
         url = f"{WORKER_SERVICES['loyalty']}/loyalty/tier/{customer_id}"
-        response = requests.get(url, timeout=5)
+        response = await _worker_client.get(url, timeout=5)
         response.raise_for_status()
         
-        tier_data = response.json()
+        tier_data = _loads(response.content)
         points = tier_data.get("points", 0)
         tier = tier_data.get("tier", "Bronze")
         benefits = tier_data.get("benefits", {})
@@ -1091,9 +1402,9 @@ async def call_loyalty_worker(state: SalesAgentState) -> SalesAgentState:
                 "user_id": customer_id,
                 "cart_total": cart_total
             }
-            promo_response = requests.post(promo_url, json=promo_payload, timeout=5)
+            promo_response = await _worker_client.post(promo_url, content=_dumps(promo_payload), headers=_JSON_HEADERS, timeout=5)
             promo_response.raise_for_status()
-            promo_data = promo_response.json()
+            promo_data = _loads(promo_response.content)
             
             # Build response with promotions
             if promo_data.get("applicable_promotions"):
@@ -1301,15 +1612,9 @@ async def call_fulfillment_worker(state: SalesAgentState) -> SalesAgentState:
                 eta = fulfillment.get('eta', 'N/A')
                 
                 # Format user-friendly status message
-                status_messages = {
-                    'PROCESSING': '📦 Your order is being processed and packed.',
-                    'PACKED': '✅ Your order has been packed and is ready for shipment.',
-                    'SHIPPED': '🚚 Your order has been shipped!',
-                    'OUT_FOR_DELIVERY': '🏃 Your order is out for delivery!',
-                    'DELIVERED': '🎉 Your order has been delivered!'
-                }
-                
-                status_msg = status_messages.get(status, f"Status: {status}")
+                status_msg = ORDER_STATUS_MESSAGES.get(status)
+                if status_msg is None:
+                    status_msg = f"Status: {status}"
                 
                 # Build the response message
                 response_msg = (
@@ -1382,23 +1687,23 @@ async def call_virtual_circles_worker(state: SalesAgentState) -> SalesAgentState
         
         # Assign user to circle (if not already assigned)
         url = f"{WORKER_SERVICES['virtual_circles']}/circles/assign-user"
-        response = requests.post(url, params={"user_id": customer_id}, timeout=5)
+        response = await _worker_client.post(url, params={"user_id": customer_id}, timeout=5)
         response.raise_for_status()
         
-        circle_data = response.json()
+        circle_data = _loads(response.content)
         circle_id = circle_data.get("circle_id")
         
         # Get circle info
         circle_url = f"{WORKER_SERVICES['virtual_circles']}/circles/{circle_id}"
-        circle_response = requests.get(circle_url, timeout=5)
+        circle_response = await _worker_client.get(circle_url, timeout=5)
         circle_response.raise_for_status()
-        circle_info = circle_response.json()
+        circle_info = _loads(circle_response.content)
         
         # Get circle trends
         trends_url = f"{WORKER_SERVICES['virtual_circles']}/circles/{circle_id}/trends"
-        trends_response = requests.get(trends_url, params={"days": 7}, timeout=5)
+        trends_response = await _worker_client.get(trends_url, params={"days": 7}, timeout=5)
         trends_response.raise_for_status()
-        trends_data = trends_response.json()
+        trends_data = _loads(trends_response.content)
         trends = trends_data.get("trends", [])
         
         # Build response
@@ -1542,12 +1847,15 @@ def create_sales_agent_graph() -> StateGraph:
 
 # Create singleton graph instance
 _graph_instance = None
+_graph_lock = threading.Lock()
 
 def get_sales_agent_graph() -> StateGraph:
-    """Get or create the sales agent graph instance."""
+    """Get or create the sales agent graph instance (compiled at most once)."""
     global _graph_instance
     if _graph_instance is None:
-        _graph_instance = create_sales_agent_graph()
+        with _graph_lock:
+            if _graph_instance is None:
+                _graph_instance = create_sales_agent_graph()
     return _graph_instance
 
 
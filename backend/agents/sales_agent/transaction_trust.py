@@ -24,7 +24,7 @@ class TransactionStatus(str, Enum):
     FAILED = "FAILED"
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     """
     Represents a distributed transaction
@@ -50,7 +50,7 @@ class Transaction:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class AuditLogEntry:
     """
     Audit log entry for compliance and debugging
@@ -17,6 +17,7 @@ Dependencies:
 Environment Variables:
     VERTEX_PROJECT_ID: Google Cloud project ID
     VERTEX_LOCATION: Region (default: us-central1)
+    VERTEX_INTENT_CACHE_SIZE: Cached Vertex AI results for history-free messages (default: 10000, 0 disables)
     GOOGLE_APPLICATION_CREDENTIALS: Path to service account JSON key
 
 Usage:
@@ -27,10 +28,13 @@ Usage:
     )
 """
 
+import copy
+import hashlib
 import os
 import re
 import json
 import logging
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from enum import Enum
@@ -46,6 +50,24 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# One compiled scan over the phrases of the rule intents that resolve fully
+# without the LLM; messages that miss it go straight to Vertex AI
+_FAST_PATH_PREFILTER = re.compile(
+    r"\b(?:where is my order|order status|track order|track my order|where is order"
+    r"|in stock|available|stock|availability|is there|do you have)\b"
+)
+
+
+# Messages that differ only in case, spacing or trailing punctuation share a cache entry
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT = " \t\n.!?,;:"
+
+
+def _intent_cache_key(user_message: str) -> str:
+    """Hash the normalized message into a compact cache key."""
+    normalized = _WHITESPACE_RE.sub(" ", user_message.lower()).strip(_TRAILING_PUNCT)
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
 
 class IntentType(str, Enum):
     """Supported intent types for sales conversations."""
@@ -87,6 +109,9 @@ class VertexIntentDetector:
         self.model_name = model_name or os.getenv("VERTEX_MODEL", "gemini-2.0-flash-exp")
         self.model = None
         self._initialized = False
+        # LRU of Vertex AI results for messages without conversation history
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = int(os.getenv("VERTEX_INTENT_CACHE_SIZE", "10000"))
         
         # Check if Vertex AI is enabled
         vertex_enabled = os.getenv("VERTEX_ENABLED", "true").lower() == "true"
@@ -223,10 +248,30 @@ Respond with ONLY the JSON object, no additional text."""
         """
         # Try Vertex AI first
         if self._initialized and self.model:
+            # Templated requests the rules resolve completely skip the LLM round trip
+            result = self._detect_fast_path(user_message)
+            if result is not None:
+                logger.info(f"Fast-path intent: {result['intent']}")
+                return result
+            
+            # History changes the prompt, so only standalone messages are cached
+            cache_key = None
+            if self._cache_size > 0 and not conversation_history:
+                cache_key = _intent_cache_key(user_message)
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    logger.info(f"Cached Vertex AI intent: {cached['intent']}")
+                    return copy.deepcopy(cached)
+            
             try:
                 result = await self._detect_with_vertex(user_message, conversation_history)
                 result["method"] = "vertex_ai"
                 logger.info(f"Vertex AI intent: {result['intent']} (confidence: {result['confidence']:.2f})")
+                if cache_key is not None:
+                    self._cache[cache_key] = copy.deepcopy(result)
+                    if len(self._cache) > self._cache_size:
+                        self._cache.popitem(last=False)
                 return result
             except Exception as e:
                 logger.error(f"Vertex AI detection failed: {e}")
@@ -311,6 +356,25 @@ Respond with ONLY the JSON object, no additional text."""
             logger.error(f"Failed to parse Vertex AI response as JSON: {response_text}")
             raise ValueError(f"Invalid JSON response from Vertex AI: {e}")
     
+    def _detect_fast_path(self, user_message: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve order tracking with an order ID and stock checks by SKU without Vertex AI.
+        
+        Returns the rule-based result only when it is unambiguous, otherwise None.
+        """
+        if not _FAST_PATH_PREFILTER.search(user_message.lower()):
+            return None
+        
+        result = self._detect_with_rules(user_message)
+        entities = result["entities"]
+        is_tracking = result["intent"] == IntentType.SUPPORT.value and result["confidence"] >= 0.95 and "order_id" in entities
+        is_sku_stock_check = result["intent"] == IntentType.INVENTORY.value and "sku" in entities
+        if not (is_tracking or is_sku_stock_check):
+            return None
+        
+        result["method"] = "rule_fast_path"
+        return result
+    
     def _detect_with_rules(self, user_message: str) -> Dict[str, Any]:
         """
         Rule-based intent detection as fallback.
@@ -24,6 +24,8 @@ import uuid
 from datetime import datetime, timedelta
 import random
 import logging
+import logging.handlers
+import os
 import httpx
 import redis_utils
 import json
@@ -38,6 +40,21 @@ import orders_repository
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Status updates and events log at INFO on every transition; buffer those and
+# write them in batches. WARNING and above flush the buffer immediately, and a
+# scheduler job (below) flushes at least once per LOG_FLUSH_SECONDS.
+LOG_BATCH_SIZE = int(os.getenv("FULFILLMENT_LOG_BATCH_SIZE", "128"))
+LOG_FLUSH_SECONDS = float(os.getenv("FULFILLMENT_LOG_FLUSH_SECONDS", "1"))
+_log_target = logging.StreamHandler()
+_log_target.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+_log_buffer = logging.handlers.MemoryHandler(
+    capacity=LOG_BATCH_SIZE,
+    flushLevel=logging.WARNING,
+    target=_log_target,
+)
+logger.addHandler(_log_buffer)
+logger.propagate = False
+
 app = FastAPI(
     title="Fulfillment Agent",
     description="Fulfillment management and logistics coordination system",
@@ -106,6 +123,7 @@ app.add_middleware(
 
 # Initialize scheduler for auto-progression
 scheduler = BackgroundScheduler()
+scheduler.add_job(_log_buffer.flush, 'interval', seconds=LOG_FLUSH_SECONDS, id="flush_log_buffer")
 scheduler.start()
 
 
@@ -149,25 +167,14 @@ def _schedule_next_progression(order_id: str):
                 logger.info(f"Auto-progression disabled for order {order_id}")
                 return
             
-            # Define status progression
-            status_progression = [
-                FulfillmentStatus.PROCESSING,
-                FulfillmentStatus.PACKED,
-                FulfillmentStatus.SHIPPED,
-                FulfillmentStatus.OUT_FOR_DELIVERY,
-                FulfillmentStatus.DELIVERED
-            ]
-            
-            # Find current index
-            try:
-                current_index = status_progression.index(fulfillment.current_status)
-            except ValueError:
+            # Find the next status in the progression
+            if fulfillment.current_status not in _NEXT_STATUS:
                 logger.error(f"Invalid status for order {order_id}: {fulfillment.current_status}")
                 return
+            next_status = _NEXT_STATUS[fulfillment.current_status]
             
             # Progress to next status if not at end
-            if current_index < len(status_progression) - 1:
-                next_status = status_progression[current_index + 1]
+            if next_status is not None:
                 old_status = fulfillment.current_status
                 
                 # Update status
@@ -204,15 +211,7 @@ def _schedule_next_progression(order_id: str):
                 try:
                     order = orders_repository.get_order(order_id)
                     if order:
-                        # Map fulfillment status to order status
-                        status_mapping = {
-                            'PROCESSING': 'processing',
-                            'PACKED': 'packed',
-                            'SHIPPED': 'shipped',
-                            'OUT_FOR_DELIVERY': 'out_for_delivery',
-                            'DELIVERED': 'delivered'
-                        }
-                        order['status'] = status_mapping.get(str(next_status), str(next_status).lower())
+                        order['status'] = ORDER_STATUS_FOR_FULFILLMENT[next_status]
                         orders_repository.upsert_order_record(order)
                         logger.info(f"✅ Updated order status in orders.csv: {order_id} → {order['status']}")
                 except Exception as e:
@@ -223,8 +222,8 @@ def _schedule_next_progression(order_id: str):
                     "event_type": "STATUS_UPDATED",
                     "timestamp": _now_iso(),
                     "details": {
-                        "from_status": str(old_status),
-                        "to_status": str(next_status),
+                        "from_status": old_status.value,
+                        "to_status": next_status.value,
                         "auto_progression": True
                     }
                 })
@@ -304,6 +303,29 @@ class DeliveryWindow(str, Enum):
     EVENING = "evening"      # 6 PM - 10 PM
 
 
+# Order-level status (orders.csv) for each fulfillment status, computed once.
+# str() on these str-mixin enums yields "FulfillmentStatus.X", so always go through .value
+ORDER_STATUS_FOR_FULFILLMENT = {status: status.value.lower() for status in FulfillmentStatus}
+
+# Courier partners as a tuple so random selection doesn't rebuild a list per order
+_COURIER_PARTNERS = tuple(CourierPartner)
+
+# Strict workflow: PROCESSING → PACKED → SHIPPED → OUT_FOR_DELIVERY → DELIVERED
+STATUS_PROGRESSION = (
+    FulfillmentStatus.PROCESSING,
+    FulfillmentStatus.PACKED,
+    FulfillmentStatus.SHIPPED,
+    FulfillmentStatus.OUT_FOR_DELIVERY,
+    FulfillmentStatus.DELIVERED,
+)
+
+# Next allowed status for each status (None once delivered)
+_NEXT_STATUS = {
+    status: STATUS_PROGRESSION[i + 1] if i + 1 < len(STATUS_PROGRESSION) else None
+    for i, status in enumerate(STATUS_PROGRESSION)
+}
+
+
 # ============================================================================
 # DATA MODELS
 # ============================================================================
@@ -461,7 +483,7 @@ def _generate_tracking_id() -> str:
 
 def _select_courier() -> CourierPartner:
     """Randomly select a courier partner."""
-    return random.choice(list(CourierPartner))
+    return random.choice(_COURIER_PARTNERS)
 
 
 def _generate_otp() -> str:
@@ -492,7 +514,7 @@ def _add_event(fulfillment: FulfillmentRecord, event_type: EventType, details: D
         details=details
     )
     fulfillment.events_log.append(event)
-    logger.info(f"Event logged for order {fulfillment.order_id}: {event_type}")
+    logger.info("Event logged for order %s: %s", fulfillment.order_id, event_type.value)
 
 
 def _validate_status_transition(current: FulfillmentStatus, target: FulfillmentStatus) -> bool:
@@ -507,16 +529,8 @@ def _validate_status_transition(current: FulfillmentStatus, target: FulfillmentS
     Returns:
         True if transition is valid, False otherwise
     """
-    valid_transitions = {
-        FulfillmentStatus.PROCESSING: [FulfillmentStatus.PACKED],
-        FulfillmentStatus.PACKED: [FulfillmentStatus.SHIPPED],
-        FulfillmentStatus.SHIPPED: [FulfillmentStatus.OUT_FOR_DELIVERY],
-        FulfillmentStatus.OUT_FOR_DELIVERY: [FulfillmentStatus.DELIVERED],
-        FulfillmentStatus.DELIVERED: [],  # Terminal state
-    }
-    
-    allowed = valid_transitions.get(current, [])
-    return target in allowed
+    next_status = _NEXT_STATUS.get(current)
+    return next_status is not None and next_status == target
 
 
 def _update_status_timestamp(fulfillment: FulfillmentRecord, status: FulfillmentStatus) -> None:
@@ -747,8 +761,8 @@ def update_status(request: UpdateStatusRequest) -> FulfillmentRecord:
         "event_type": "STATUS_UPDATED",
         "timestamp": _now_iso(),
         "details": {
-            "from_status": str(old_status),
-            "to_status": str(request.new_status)
+            "from_status": old_status.value,
+            "to_status": request.new_status.value
         }
     })
     
@@ -837,7 +851,7 @@ async def handle_failed_delivery(request: HandleFailedDeliveryRequest) -> Fulfil
         "timestamp": _now_iso(),
         "details": {
             "reason": request.reason,
-            "current_status": str(fulfillment.current_status)
+            "current_status": fulfillment.current_status.value
         }
     })
     
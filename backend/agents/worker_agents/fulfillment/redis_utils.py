@@ -8,6 +8,7 @@ using Redis hash structures and sorted sets for efficient querying.
 import redis
 import json
 import os
+from enum import Enum
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 from datetime import datetime
@@ -100,6 +101,9 @@ def store_fulfillment(order_id: str, fulfillment_data: Dict[str, Any]) -> bool:
     for field, value in fulfillment_data.items():
         if isinstance(value, (dict, list)):
             data_to_store[field] = json.dumps(value)
+        elif isinstance(value, Enum):
+            # str() would store "FulfillmentStatus.X"; persist the plain value
+            data_to_store[field] = value.value
         else:
             data_to_store[field] = str(value) if value is not None else ""
     
@@ -115,6 +119,8 @@ def store_fulfillment(order_id: str, fulfillment_data: Dict[str, Any]) -> bool:
     
     # Add to status index
     status = fulfillment_data.get("current_status", "PROCESSING")
+    if isinstance(status, Enum):
+        status = status.value
     redis_client.sadd(_status_index_key(status), order_id)
     
     return True
@@ -1,10 +1,11 @@
 # Inventory Agent - FastAPI Server
-# Endpoints: GET /inventory/{sku}, POST /hold, POST /release, POST /simulate/sale
+# Endpoints: GET /inventory/{sku}, POST /inventory/bulk, POST /hold, POST /hold/bulk,
+#            POST /release, POST /simulate/sale
 
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, List
 import uvicorn
 import uuid
 from datetime import datetime
@@ -37,6 +38,16 @@ class HoldRequest(BaseModel):
     ttl: int = Field(default=300, description="Hold duration in seconds")
 
 
+class BulkInventoryRequest(BaseModel):
+    skus: List[str] = Field(..., description="Product SKUs to look up")
+
+
+class BulkHoldRequest(BaseModel):
+    # Raw dicts so one malformed hold fails on its own instead of rejecting the batch
+    holds: List[dict] = Field(..., description="Holds to create (HoldRequest fields)")
+    session_id: Optional[str] = Field(default=None, description="Checkout session the holds belong to")
+
+
 class ReleaseRequest(BaseModel):
     hold_id: str = Field(..., description="Hold ID to release")
 
@@ -64,6 +75,14 @@ class HoldResponse(BaseModel):
     status: str
 
 
+class BulkInventoryResponse(BaseModel):
+    items: dict
+
+
+class BulkHoldResponse(BaseModel):
+    holds: list
+
+
 class ReleaseResponse(BaseModel):
     hold_id: str
     status: str
@@ -91,7 +110,9 @@ async def root():
         "redis_connected": redis_utils.check_redis_health(),
         "endpoints": {
             "inventory": "GET /inventory/{sku}",
+            "inventory_bulk": "POST /inventory/bulk",
             "hold": "POST /hold",
+            "hold_bulk": "POST /hold/bulk",
             "release": "POST /release",
             "simulate_sale": "POST /simulate/sale"
         }
@@ -125,20 +146,39 @@ async def get_inventory(sku: str):
     Returns online and store-specific stock.
     """
     try:
-        stock_data = redis_utils.get_stock(sku)
-        
-        total = stock_data["online"] + sum(stock_data["stores"].values())
-        
-        return InventoryResponse(
-            sku=sku,
-            online_stock=stock_data["online"],
-            store_stock=stock_data["stores"],
-            total_stock=total
-        )
+        return _inventory_for(sku)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching inventory: {str(e)}")
+
+
+@app.post("/inventory/bulk", response_model=BulkInventoryResponse)
+async def get_inventory_bulk(request: BulkInventoryRequest):
+    """
+    Get stock levels for several SKUs in one round-trip.
+    
+    Returns a mapping of SKU to the same payload as GET /inventory/{sku}.
+    """
+    try:
+        items = {sku: _inventory_for(sku).dict() for sku in dict.fromkeys(request.skus)}
+        return BulkInventoryResponse(items=items)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching inventory: {str(e)}")
 
 
+def _inventory_for(sku: str) -> InventoryResponse:
+    """Build the stock payload for a single SKU."""
+    stock_data = redis_utils.get_stock(sku)
+    
+    total = stock_data["online"] + sum(stock_data["stores"].values())
+    
+    return InventoryResponse(
+        sku=sku,
+        online_stock=stock_data["online"],
+        store_stock=stock_data["stores"],
+        total_stock=total
+    )
+
+
 @app.post("/hold", response_model=HoldResponse)
 async def create_hold(
     request: HoldRequest,
@@ -161,50 +201,7 @@ async def create_hold(
             if cached_response:
                 return HoldResponse(**cached_response)
         
-        # Generate hold ID
-        hold_id = f"hold-{uuid.uuid4()}"
-        
-        # Atomic stock decrement
-        remaining = redis_utils.hold_stock_atomic(
-            request.sku,
-            request.quantity,
-            request.location
-        )
-        
-        if remaining < 0:
-            raise HTTPException(
-                status_code=409,
-                detail=f"Insufficient stock for {request.sku} at {request.location}"
-            )
-        
-        # Calculate expiry time
-        import time
-        expiry_timestamp = time.time() + request.ttl
-        expires_at = datetime.fromtimestamp(expiry_timestamp).isoformat()
-        
-        # Create hold with TTL
-        hold_data = {
-            "hold_id": hold_id,
-            "sku": request.sku,
-            "quantity": request.quantity,
-            "location": request.location,
-            "created_at": datetime.utcnow().isoformat(),
-            "expires_at": expires_at,
-            "status": "active"
-        }
-        
-        redis_utils.create_hold(hold_id, hold_data, request.ttl)
-        
-        # Build response
-        response = HoldResponse(
-            hold_id=hold_id,
-            sku=request.sku,
-            quantity=request.quantity,
-            location=request.location,
-            remaining_stock=remaining,
-            expires_at=expires_at,
-            status="active"
-        )
+        response = _create_hold(request)
         
         # Save for idempotency
         if idempotency_key:
@@ -218,6 +215,79 @@ async def create_hold(
         raise HTTPException(status_code=500, detail=f"Error creating hold: {str(e)}")
 
 
+@app.post("/hold/bulk", response_model=BulkHoldResponse)
+async def create_holds_bulk(request: BulkHoldRequest):
+    """
+    Create several inventory holds in one round-trip.
+    
+    Each hold is attempted independently; failures are reported per item
+    (in request order) instead of failing the whole batch.
+    """
+    holds = []
+    for raw_hold in request.holds:
+        try:
+            hold_request = HoldRequest(**raw_hold)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            holds.append({"sku": raw_hold.get("sku"), "status": "failed", "error": f"Invalid hold: {errors}"})
+            continue
+        try:
+            holds.append(_create_hold(hold_request).dict())
+        except HTTPException as e:
+            holds.append({"sku": hold_request.sku, "status": "failed", "error": e.detail})
+        except Exception as e:
+            holds.append({"sku": hold_request.sku, "status": "failed", "error": f"Error creating hold: {str(e)}"})
+    
+    return BulkHoldResponse(holds=holds)
+
+
+def _create_hold(request: HoldRequest) -> HoldResponse:
+    """Atomically decrement stock and record a hold with TTL."""
+    # Generate hold ID
+    hold_id = f"hold-{uuid.uuid4()}"
+    
+    # Atomic stock decrement
+    remaining = redis_utils.hold_stock_atomic(
+        request.sku,
+        request.quantity,
+        request.location
+    )
+    
+    if remaining < 0:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Insufficient stock for {request.sku} at {request.location}"
+        )
+    
+    # Calculate expiry time
+    import time
+    expiry_timestamp = time.time() + request.ttl
+    expires_at = datetime.fromtimestamp(expiry_timestamp).isoformat()
+    
+    # Create hold with TTL
+    hold_data = {
+        "hold_id": hold_id,
+        "sku": request.sku,
+        "quantity": request.quantity,
+        "location": request.location,
+        "created_at": datetime.utcnow().isoformat(),
+        "expires_at": expires_at,
+        "status": "active"
+    }
+    
+    redis_utils.create_hold(hold_id, hold_data, request.ttl)
+    
+    return HoldResponse(
+        hold_id=hold_id,
+        sku=request.sku,
+        quantity=request.quantity,
+        location=request.location,
+        remaining_stock=remaining,
+        expires_at=expires_at,
+        status="active"
+    )
+
+
 @app.post("/release", response_model=ReleaseResponse)
 async def release_hold(request: ReleaseRequest):
     """
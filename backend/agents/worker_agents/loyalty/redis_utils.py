@@ -184,6 +184,40 @@ def mark_coupon_used(user_id: str, coupon_code: str, expiry_days: int = 365) ->
     return True
 
 
+# Tier rules, highest threshold first: (min_points, tier, next_tier, next_tier_at, benefits).
+# Benefit dicts are shared between calls; callers only read them.
+_TIER_RULES = (
+    (2000, "Platinum", None, None, {
+        "discount_percent": 15,
+        "free_shipping": True,
+        "priority_support": True,
+        "birthday_bonus": 500,
+        "points_multiplier": 2.0
+    }),
+    (1000, "Gold", "Platinum", 2000, {
+        "discount_percent": 10,
+        "free_shipping": True,
+        "priority_support": False,
+        "birthday_bonus": 300,
+        "points_multiplier": 1.5
+    }),
+    (500, "Silver", "Gold", 1000, {
+        "discount_percent": 5,
+        "free_shipping": False,
+        "priority_support": False,
+        "birthday_bonus": 150,
+        "points_multiplier": 1.2
+    }),
+    (0, "Bronze", "Silver", 500, {
+        "discount_percent": 0,
+        "free_shipping": False,
+        "priority_support": False,
+        "birthday_bonus": 0,
+        "points_multiplier": 1.0
+    }),
+)
+
+
 def calculate_tier(points: int) -> dict:
     """
     Calculate user tier based on total points.
@@ -195,58 +229,15 @@ def calculate_tier(points: int) -> dict:
 
     Returns: {"tier": str, "next_tier": str, "points_to_next": int, "benefits": dict}
     """
-    if points >= 2000:
-        return {
-            "tier": "Platinum",
-            "next_tier": None,
-            "points_to_next": 0,
-            "benefits": {
-                "discount_percent": 15,
-                "free_shipping": True,
-                "priority_support": True,
-                "birthday_bonus": 500,
-                "points_multiplier": 2.0
-            }
-        }
-    elif points >= 1000:
-        return {
-            "tier": "Gold",
-            "next_tier": "Platinum",
-            "points_to_next": 2000 - points,
-            "benefits": {
-                "discount_percent": 10,
-                "free_shipping": True,
-                "priority_support": False,
-                "birthday_bonus": 300,
-                "points_multiplier": 1.5
-            }
-        }
-    elif points >= 500:
-        return {
-            "tier": "Silver",
-            "next_tier": "Gold",
-            "points_to_next": 1000 - points,
-            "benefits": {
-                "discount_percent": 5,
-                "free_shipping": False,
-                "priority_support": False,
-                "birthday_bonus": 150,
-                "points_multiplier": 1.2
-            }
-        }
-    else:
-        return {
-            "tier": "Bronze",
-            "next_tier": "Silver",
-            "points_to_next": 500 - points,
-            "benefits": {
-                "discount_percent": 0,
-                "free_shipping": False,
-                "priority_support": False,
-                "birthday_bonus": 0,
-                "points_multiplier": 1.0
-            }
-        }
+    _, tier, next_tier, next_tier_at, benefits = next(
+        (rule for rule in _TIER_RULES if points >= rule[0]), _TIER_RULES[-1]
+    )
+    return {
+        "tier": tier,
+        "next_tier": next_tier,
+        "points_to_next": next_tier_at - points if next_tier_at is not None else 0,
+        "benefits": benefits
+    }
 
 
 def get_user_tier_info(user_id: str) -> dict:
@@ -12,17 +12,26 @@ Endpoints:
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
 import uvicorn
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import redis_utils
 
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 app = FastAPI(
     title="Post-Purchase Support Agent",
     description="Handles returns, exchanges, and customer complaints",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
 )
 
 # CORS configuration
@@ -200,6 +209,10 @@ RETURN_REASONS = {
     }
 }
 
+# Static views of RETURN_REASONS served by the listing endpoint and error detail
+_RETURN_REASON_LIST = tuple(RETURN_REASONS.values())
+_RETURN_REASON_CODES = list(RETURN_REASONS)
+
 ISSUE_TYPES = [
     "delivery_issue",
     "payment_issue",
@@ -209,6 +222,7 @@ ISSUE_TYPES = [
     "account_issue",
     "other"
 ]
+_ISSUE_TYPE_SET = frozenset(ISSUE_TYPES)
 
 
 # ==========================================
@@ -230,8 +244,8 @@ async def root():
 async def get_return_reasons():
     """Get list of all return reasons"""
     return {
-        "return_reasons": list(RETURN_REASONS.values()),
-        "total_reasons": len(RETURN_REASONS)
+        "return_reasons": _RETURN_REASON_LIST,
+        "total_reasons": len(_RETURN_REASON_LIST)
     }
 
 
@@ -253,10 +267,12 @@ async def process_return(request: ReturnRequest):
         if request.reason_code not in RETURN_REASONS:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid return reason. Valid codes: {list(RETURN_REASONS.keys())}"
+                detail=f"Invalid return reason. Valid codes: {_RETURN_REASON_CODES}"
             )
         
         reason_info = RETURN_REASONS[request.reason_code]
+        now = datetime.now()
+        timestamp = now.isoformat()
         
         # Step 1.5: Verify order exists in orders.csv
         order = redis_utils.get_order_details(request.order_id)
@@ -278,7 +294,7 @@ async def process_return(request: ReturnRequest):
                 }],
                 'total_amount': 0,
                 'status': 'completed',
-                'created_at': datetime.now().isoformat(),
+                'created_at': timestamp,
             }
 
         # Verify user owns this order when the record exists
@@ -294,8 +310,7 @@ async def process_return(request: ReturnRequest):
         return_id = f"RET_{uuid.uuid4().hex[:12].upper()}"
         
         # Step 3: Calculate pickup date (2 days from now)
-        from datetime import timedelta
-        pickup_date = (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")
+        pickup_date = (now + timedelta(days=2)).strftime("%Y-%m-%d")
         
         # Step 4: Store return request
         return_data = {
@@ -308,7 +323,7 @@ async def process_return(request: ReturnRequest):
             "additional_comments": request.additional_comments or "",
             "status": "initiated",
             "pickup_date": pickup_date,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "refund_status": "pending",
             "order_verified": order_verified
         }
@@ -327,7 +342,7 @@ async def process_return(request: ReturnRequest):
             ),
             pickup_date=pickup_date,
             refund_amount=None,  # Will be calculated after item received
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp
         )
         
     except HTTPException:
@@ -350,6 +365,9 @@ async def process_exchange(request: ExchangeRequest):
     5. Schedule pickup of old item
     """
     try:
+        now = datetime.now()
+        timestamp = now.isoformat()
+
         # Step 1: Verify order exists in orders.csv
         order = redis_utils.get_order_details(request.order_id)
         order_verified = bool(order)
@@ -369,7 +387,7 @@ async def process_exchange(request: ExchangeRequest):
                 }],
                 'total_amount': 0,
                 'status': 'completed',
-                'created_at': datetime.now().isoformat(),
+                'created_at': timestamp,
             }
 
         # Verify user owns this order when available
@@ -385,8 +403,7 @@ async def process_exchange(request: ExchangeRequest):
         exchange_id = f"EXC_{uuid.uuid4().hex[:12].upper()}"
         
         # Calculate delivery date
-        from datetime import timedelta
-        delivery_date = (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+        delivery_date = (now + timedelta(days=5)).strftime("%Y-%m-%d")
         
         # Store exchange request
         exchange_data = {
@@ -399,7 +416,7 @@ async def process_exchange(request: ExchangeRequest):
             "reason": request.reason or "Size exchange",
             "status": "initiated",
             "delivery_date": delivery_date,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "order_verified": order_verified
         }
         
@@ -416,7 +433,7 @@ async def process_exchange(request: ExchangeRequest):
             ),
             new_product_sku=request.product_sku,  # Same SKU, different size
             delivery_date=delivery_date,
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp
         )
         
     except Exception as e:
@@ -436,15 +453,17 @@ async def raise_complaint(request: ComplaintRequest):
     """
     try:
         # Validate issue type
-        if request.issue_type not in ISSUE_TYPES:
+        if request.issue_type not in _ISSUE_TYPE_SET:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid issue type. Valid types: {ISSUE_TYPES}"
             )
         
         # Generate IDs
+        now = datetime.now()
+        timestamp = now.isoformat()
         complaint_id = f"CMP_{uuid.uuid4().hex[:12].upper()}"
-        ticket_number = f"TKT{datetime.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:6].upper()}"
+        ticket_number = f"TKT{now.strftime('%Y%m%d')}{uuid.uuid4().hex[:6].upper()}"
         
         # Store complaint
         complaint_data = {
@@ -456,7 +475,7 @@ async def raise_complaint(request: ComplaintRequest):
             "description": request.description,
             "priority": request.priority,
             "status": "open",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "assigned_to": "support_team"
         }
         
@@ -468,7 +487,7 @@ async def raise_complaint(request: ComplaintRequest):
             status="open",
             ticket_number=ticket_number,
             message=f"Complaint registered. Ticket: {ticket_number}. Our support team will contact you within 24 hours.",
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp
         )
         
     except HTTPException:
@@ -549,13 +568,14 @@ async def register_order(request: RegisterOrderRequest):
     Called by frontend after successful payment to enable returns, exchanges, etc.
     """
     try:
+        timestamp = datetime.now().isoformat()
         order_data = {
             "order_id": request.order_id,
             "customer_id": request.user_id,  # Map user_id to customer_id for redis_utils
             "items": [item.dict() for item in request.items],
             "total_amount": request.amount,
             "status": request.status or "completed",
-            "created_at": request.created_at or datetime.now().isoformat(),
+            "created_at": request.created_at or timestamp,
             "shipping_address": request.shipping_address,
             "metadata": request.metadata,
         }
@@ -568,7 +588,7 @@ async def register_order(request: RegisterOrderRequest):
             "order_id": request.order_id,
             "status": "registered",
             "message": f"Order {request.order_id} registered for post-purchase support",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
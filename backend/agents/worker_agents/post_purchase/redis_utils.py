@@ -44,11 +44,16 @@ PRODUCTS_CSV = os.path.join(os.path.dirname(__file__), "../../../data/products.c
 # Load products once (catalog relatively static)
 products_df = pd.read_csv(PRODUCTS_CSV)
 
-# Load orders once (can be reloaded if needed)
+# Load orders once; _refresh_orders() reloads them when orders.csv changes on disk
 try:
     orders_df = pd.read_csv(ORDERS_CSV)
+    _orders_mtime: Optional[float] = os.path.getmtime(ORDERS_CSV)
 except Exception:
     orders_df = pd.DataFrame()
+    _orders_mtime = None
+
+# Enriched CSV order details by order_id, valid until orders.csv changes
+_order_details_cache: Dict[str, Dict] = {}
 
 # Normalize column names for new CSV schema
 if "product_display_name" in products_df.columns and "ProductDisplayName" not in products_df.columns:
@@ -85,15 +90,32 @@ def _get_dynamic_order(order_id: str) -> Optional[Dict]:
     return None
 
 
-def get_order_details(order_id: str) -> Optional[Dict]:
-    """Get order details from orders.csv or dynamically registered orders."""
-    global orders_df
-    
-    # Reload orders to get latest data
+def _refresh_orders() -> None:
+    """Reload orders.csv if it changed since the last load."""
+    global orders_df, _orders_mtime
+
+    try:
+        mtime = os.path.getmtime(ORDERS_CSV)
+    except OSError:
+        return
+    if mtime == _orders_mtime:
+        return
+
     try:
         orders_df = pd.read_csv(ORDERS_CSV)
     except Exception:
-        pass
+        return
+    _orders_mtime = mtime
+    _order_details_cache.clear()
+
+
+def get_order_details(order_id: str) -> Optional[Dict]:
+    """Get order details from orders.csv or dynamically registered orders."""
+    _refresh_orders()
+
+    cached = _order_details_cache.get(order_id)
+    if cached is not None:
+        return cached
     
     order = orders_df[orders_df['order_id'] == order_id]
 
@@ -122,7 +144,7 @@ def get_order_details(order_id: str) -> Optional[Dict]:
                 "line_total": item['line_total']
             })
     
-    return {
+    details = {
         "order_id": row['order_id'],
         "customer_id": str(row['customer_id']),
         "items": enriched_items,
@@ -130,17 +152,13 @@ def get_order_details(order_id: str) -> Optional[Dict]:
         "status": row['status'],
         "created_at": row['created_at']
     }
+    _order_details_cache[order_id] = details
+    return details
 
 
 def get_user_orders(user_id: str) -> List[Dict]:
     """Get all orders for a user"""
-    global orders_df
-    
-    # Reload orders to get latest data
-    try:
-        orders_df = pd.read_csv(ORDERS_CSV)
-    except Exception:
-        pass
+    _refresh_orders()
     
     user_orders = orders_df[orders_df['customer_id'] == int(user_id)]
     
@@ -12,6 +12,7 @@ import json
 import ast
 from pathlib import Path
 import re
+import time
 from datetime import datetime
 import logging
 import os
@@ -219,12 +220,12 @@ def load_data_with_supabase_fallback():
         # Try Supabase for products
         products_df = products_repo.get_all_products()
         if products_df is not None:
-            logger.info(f"✅ Loaded {len(products_df)} products from Supabase")
+            logger.info("✅ Loaded %d products from Supabase", len(products_df))
         
         # Try Supabase for customers
         customers_df = get_all_customers()
         if customers_df is not None:
-            logger.info(f"✅ Loaded {len(customers_df)} customers from Supabase")
+            logger.info("✅ Loaded %d customers from Supabase", len(customers_df))
         
         # Inventory - get all rows
         try:
@@ -235,7 +236,7 @@ def load_data_with_supabase_fallback():
                     inventory_df = pd.DataFrame(inv_rows)
                     if "quantity" in inventory_df.columns and "qty" not in inventory_df.columns:
                         inventory_df = inventory_df.rename(columns={"quantity": "qty"})
-                    logger.info(f"✅ Loaded {len(inventory_df)} inventory records from Supabase")
+                    logger.info("✅ Loaded %d inventory records from Supabase", len(inventory_df))
         except Exception as e:
             logger.warning(f"⚠️ Supabase inventory load failed: {e}")
         
@@ -246,7 +247,7 @@ def load_data_with_supabase_fallback():
                 order_rows = select("orders")
                 if order_rows:
                     orders_df = pd.DataFrame(order_rows)
-                    logger.info(f"✅ Loaded {len(orders_df)} orders from Supabase")
+                    logger.info("✅ Loaded %d orders from Supabase", len(orders_df))
         except Exception as e:
             logger.warning(f"⚠️ Supabase orders load failed: {e}")
             
@@ -258,7 +259,7 @@ def load_data_with_supabase_fallback():
     
     if products_df is None or products_df.empty:
         products_df = csv_products
-        logger.info(f"📦 Using CSV fallback: {len(products_df)} products")
+        logger.info("📦 Using CSV fallback: %d products", len(products_df))
     
     # Ensure products_df has required fields for Kiosk/WhatsApp UI and filtering
     # Add image_url if missing - use proper pandas syntax to check for image column
@@ -299,15 +300,15 @@ def load_data_with_supabase_fallback():
     
     if customers_df is None or customers_df.empty:
         customers_df = csv_customers
-        logger.info(f"📦 Using CSV fallback: {len(customers_df)} customers")
+        logger.info("📦 Using CSV fallback: %d customers", len(customers_df))
     
     if orders_df is None or orders_df.empty:
         orders_df = csv_orders
-        logger.info(f"📦 Using CSV fallback: {len(orders_df)} orders")
+        logger.info("📦 Using CSV fallback: %d orders", len(orders_df))
     
     if inventory_df is None or inventory_df.empty:
         inventory_df = csv_inventory
-        logger.info(f"📦 Using CSV fallback: {len(inventory_df)} inventory records")
+        logger.info("📦 Using CSV fallback: %d inventory records", len(inventory_df))
     
     return products_df, customers_df, orders_df, inventory_df
 
@@ -476,14 +477,14 @@ def get_inventory_availability(sku: str) -> bool:
     try:
         # If inventory_df is empty/not loaded, assume in stock (don't filter out products)
         if inventory_df is None or inventory_df.empty:
-            logger.debug(f"Inventory data not loaded, assuming SKU {sku} is in stock")
+            logger.debug("Inventory data not loaded, assuming SKU %s is in stock", sku)
             return True
         
         inventory = inventory_df[inventory_df['sku'] == sku]
         
         if inventory.empty:
             # SKU not in inventory table - assume in stock rather than filtering it out
-            logger.debug(f"SKU {sku} not found in inventory, assuming in stock")
+            logger.debug("SKU %s not found in inventory, assuming in stock", sku)
             return True
         
         # Determine the quantity column name (support multiple CSV variants)
@@ -507,13 +508,13 @@ def get_inventory_availability(sku: str) -> bool:
 
         if qty_col is None:
             # No usable quantity column found; assume in stock
-            logger.debug(f"No quantity column found for SKU {sku}, assuming in stock")
+            logger.debug("No quantity column found for SKU %s, assuming in stock", sku)
             return True
 
         total_stock = inventory[qty_col].astype(float).sum()
         result = total_stock > 0
         if not result:
-            logger.debug(f"SKU {sku} has zero stock, marking out of stock")
+            logger.debug("SKU %s has zero stock, marking out of stock", sku)
         return result
     except Exception as e:
         # On any error, assume in stock rather than filtering products out
@@ -639,24 +640,17 @@ def rank_products(
     # Base score from ratings
     ranked['score'] = ranked['ratings'] * 10
     
-    # Boost from review count (popularity signal) - normalized so higher counts boost moderately
+    # Boost from review count (popularity signal) - normalized so higher counts boost moderately.
+    # Non-numeric cells coerce to 0 so no exception handling is needed on this path.
     if 'review_count' in ranked.columns:
-        try:
-            review_bonus = ranked['review_count'].astype(float).fillna(0) / 100
-            ranked['score'] += review_bonus.clip(0, 5)  # Cap at 5 points
-        except Exception:
-            pass
+        review_bonus = pd.to_numeric(ranked['review_count'], errors='coerce').fillna(0) / 100
+        ranked['score'] += review_bonus.clip(0, 5)  # Cap at 5 points
     
     # Freshness boost for current/recent products
     if 'season' in ranked.columns and 'year' in ranked.columns:
-        try:
-            from datetime import datetime
-            current_year = datetime.now().year
-            year_diff = ranked['year'].astype(float).fillna(0)
-            # Favor recent years (within 2 years) slightly
-            ranked['score'] += (2 - year_diff.clip(0, 2)) * 0.5
-        except Exception:
-            pass
+        year_diff = pd.to_numeric(ranked['year'], errors='coerce').fillna(0)
+        # Favor recent years (within 2 years) slightly
+        ranked['score'] += (2 - year_diff.clip(0, 2)) * 0.5
     
     # Base color affinity boost (if customer has color preference in intent)
     if 'color' in intent and intent['color']:
@@ -1279,6 +1273,49 @@ Write a genuine, emotional message that the giver would write on a gift card. Be
     return recommendations
 
 
+# Trending SKUs are derived from the most recent orders; recomputing the
+# date parse + sort + value_counts on every trendseer request is wasted work.
+TRENDING_CACHE_TTL_SECONDS = 86400
+_trending_cache: Dict[str, Any] = {"computed_at": 0.0, "skus": []}
+
+
+def _compute_trending_skus() -> List[str]:
+    """Return the top 50 SKUs across the 200 most recent orders."""
+    # Be defensive: orders.csv may use different timestamp column names; try common variants
+    date_candidates = ['order_date', 'created_at', 'order_ts', 'date', 'timestamp', 'order_timestamp', 'order_date_utc']
+    date_col = None
+    for c in date_candidates:
+        if c in orders_df.columns:
+            date_col = c
+            break
+
+    if date_col is None:
+        # No obvious date column — log available columns and fall back to unsorted recent orders
+        logger.warning("Orders DataFrame missing expected date column; available columns: %s", orders_df.columns.tolist())
+        recent_orders = orders_df.head(200)
+    else:
+        # Coerce to datetime where possible and sort
+        try:
+            orders_df[date_col] = pd.to_datetime(orders_df[date_col], errors='coerce')
+            recent_orders = orders_df.dropna(subset=[date_col]).sort_values(date_col, ascending=False).head(200)
+        except Exception:
+            logger.exception("Failed to parse date column '%s' in orders_df; falling back to unsorted head()", date_col)
+            recent_orders = orders_df.head(200)
+    return recent_orders['product_sku'].value_counts().head(50).index.tolist()
+
+
+def get_trending_skus() -> List[str]:
+    """Trending SKUs, recomputed at most once per TRENDING_CACHE_TTL_SECONDS."""
+    now = time.time()
+    if now - _trending_cache["computed_at"] < TRENDING_CACHE_TTL_SECONDS:
+        return list(_trending_cache["skus"])
+
+    skus = _compute_trending_skus()
+    _trending_cache["skus"] = skus
+    _trending_cache["computed_at"] = now
+    return list(skus)
+
+
 async def _mode_trendseer(request: RecommendationRequest, customer_profile: Dict, past_skus: List[str]) -> List[Dict]:
     """MODE 3: TrendSeer - predictive fashion oracle"""
     
@@ -1310,28 +1347,8 @@ async def _mode_trendseer(request: RecommendationRequest, customer_profile: Dict
     if fav_colors:
         fav_colors = [c for c, _ in Counter(fav_colors).most_common(2)]
     
-    # Detect trending SKUs
-    # Be defensive: orders.csv may use different timestamp column names; try common variants
-    date_candidates = ['order_date', 'created_at', 'order_ts', 'date', 'timestamp', 'order_timestamp', 'order_date_utc']
-    date_col = None
-    for c in date_candidates:
-        if c in orders_df.columns:
-            date_col = c
-            break
-
-    if date_col is None:
-        # No obvious date column — log available columns and fall back to unsorted recent orders
-        logger.warning("Orders DataFrame missing expected date column; available columns: %s", orders_df.columns.tolist())
-        recent_orders = orders_df.head(200)
-    else:
-        # Coerce to datetime where possible and sort
-        try:
-            orders_df[date_col] = pd.to_datetime(orders_df[date_col], errors='coerce')
-            recent_orders = orders_df.dropna(subset=[date_col]).sort_values(date_col, ascending=False).head(200)
-        except Exception:
-            logger.exception("Failed to parse date column '%s' in orders_df; falling back to unsorted head()", date_col)
-            recent_orders = orders_df.head(200)
-    trending_skus = recent_orders['product_sku'].value_counts().head(50).index.tolist()
+    # Detect trending SKUs (memoized for a day - orders only change via reseeding)
+    trending_skus = get_trending_skus()
     trending = products_df[products_df['sku'].isin(trending_skus)]
     
     # Filter by buyer's gender first (for their own purchases)
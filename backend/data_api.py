@@ -5,6 +5,7 @@ Endpoints for products, customers, orders, stores, inventory
 
 from pathlib import Path
 from typing import Dict, Any
+import json
 import os
 import requests
 from dotenv import load_dotenv
@@ -68,39 +69,29 @@ if IMAGES_DIR.exists():
 
 
 # Load CSV files
+def _parse_items(value):
+    """Parse the JSON items field for orders, leaving anything else untouched."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value
+    return value
+
+
 def load_csv(filename):
     """Load CSV file and return as list of dictionaries"""
     try:
-        import math
-        import json
         df = pd.read_csv(DATA_DIR / filename)
-        records = df.to_dict(orient="records")
-        
-        # Clean NaN values from records (convert to None for JSON serialization)
-        cleaned = []
-        for record in records:
-            clean_record = {}
-            for key, value in record.items():
-                # Check if value is NaN/None and handle all cases
-                try:
-                    if pd.isna(value):
-                        clean_record[key] = None
-                    elif isinstance(value, float) and math.isnan(value):
-                        clean_record[key] = None
-                    elif key == 'items' and isinstance(value, str):
-                        # Parse JSON items field for orders
-                        try:
-                            clean_record[key] = json.loads(value)
-                        except json.JSONDecodeError:
-                            clean_record[key] = value
-                    else:
-                        clean_record[key] = value
-                except (TypeError, ValueError):
-                    # If any error in checking, just use the value
-                    clean_record[key] = value
-            cleaned.append(clean_record)
-        
-        return cleaned
+
+        # Clean NaN values column-wise (convert to None for JSON serialization)
+        # instead of probing every cell of every record
+        df = df.astype(object).where(df.notna(), None)
+        if 'items' in df.columns:
+            df['items'] = df['items'].map(_parse_items)
+
+        columns = df.columns.tolist()
+        return [dict(zip(columns, row)) for row in df.itertuples(index=False, name=None)]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading {filename}: {str(e)}")
 
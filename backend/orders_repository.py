@@ -92,34 +92,44 @@ def get_order(order_id: str) -> Dict[str, Any] | None:
 
 def upsert_order_record(record: Dict[str, Any]) -> None:
     """Insert or update an order entry in orders.csv in a threadsafe way."""
-    if "order_id" not in record or not record["order_id"]:
-        raise ValueError("record must include a non-empty order_id")
+    upsert_order_records([record])
 
-    logger.info(f"📝 Upserting order: {record.get('order_id')}")
 
-    csv_payload = dict(record)
-    supabase_payload = dict(record)
-    
-    # Ensure items is JSON string if it's a dict/list
-    if isinstance(csv_payload.get("items"), (dict, list)):
-        csv_payload["items"] = json.dumps(csv_payload["items"])
-        logger.debug(f"   Serialized items to JSON")
+def upsert_order_records(records: Iterable[Dict[str, Any]]) -> None:
+    """Insert or update several order entries with a single read and rewrite of orders.csv."""
+    records = list(records)
+    for record in records:
+        if "order_id" not in record or not record["order_id"]:
+            raise ValueError("record must include a non-empty order_id")
+    if not records:
+        return
+
+    logger.info(f"📝 Upserting orders: {', '.join(str(r['order_id']) for r in records)}")
+
+    csv_payloads = []
+    for record in records:
+        csv_payload = dict(record)
+        # Ensure items is JSON string if it's a dict/list
+        if isinstance(csv_payload.get("items"), (dict, list)):
+            csv_payload["items"] = json.dumps(csv_payload["items"])
+        csv_payloads.append(csv_payload)
+
+    def _csv_value(field: str, value: Any) -> str:
+        if value is None:
+            return ""
+        return str(value)
 
     with _WRITE_LOCK:
         logger.debug(f"   Acquired write lock")
         rows = _load_existing_rows()
         logger.debug(f"   Loaded {len(rows)} existing rows")
-        
-        def _csv_value(field: str, value: Any) -> str:
-            if value is None:
-                return ""
-            return str(value)
 
-        rows[csv_payload["order_id"]] = {
-            field: _csv_value(field, csv_payload.get(field, ""))
-            for field in FIELDNAMES
-        }
-        logger.debug(f"   Updated row for order_id")
+        for csv_payload in csv_payloads:
+            rows[csv_payload["order_id"]] = {
+                field: _csv_value(field, csv_payload.get(field, ""))
+                for field in FIELDNAMES
+            }
+        logger.debug(f"   Updated {len(csv_payloads)} row(s)")
 
         ORDERS_FILE.parent.mkdir(parents=True, exist_ok=True)
         logger.debug(f"   Ensured directory exists: {ORDERS_FILE.parent}")
@@ -130,7 +140,8 @@ def upsert_order_record(record: Dict[str, Any]) -> None:
             writer.writerows(rows.values())
             logger.info(f"✅ Written {len(rows)} orders to {ORDERS_FILE}")
 
-    _sync_to_supabase(supabase_payload)
+    for record in records:
+        _sync_to_supabase(dict(record))
 
 
 def _prepare_supabase_payload(record: Dict[str, Any]) -> Dict[str, Any]: